@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import List
-from app.schemas.comment import CommentCreate, CommentUpdate, CommentResponse, CommentWithUser, CommentThread
+from typing import List, Optional
+from app.schemas.comment import CommentCreate, CommentUpdate, CommentResponse, CommentWithUser, CommentWithAnswer, CommentThread, CommentThreadPage
 from app.services.comment_service import CommentService
 from app.core.auth import get_current_active_user
 from app.models.user import User
@@ -34,15 +34,63 @@ async def get_comments_by_answer(answer_id: str):
         raise
 
 @router.get("/answer/{answer_id}/threads", response_model=List[CommentThread])
-async def get_comment_threads(answer_id: str):
+async def get_comment_threads(
+    answer_id: str,
+    max_depth: Optional[int] = Query(None, ge=0)
+):
     """Get comments organized in threads (nested structure)"""
     try:
-        threads = await CommentService.get_comment_threads(answer_id)
+        threads = await CommentService.get_comment_threads(answer_id, max_depth=max_depth)
         return threads
     except Exception as e:
         logger.error(f"Get comment threads error: {e}")
         raise
 
+@router.get("/answer/{answer_id}/threads/page", response_model=CommentThreadPage)
+async def get_comment_thread_page(
+    answer_id: str,
+    limit: int = Query(20, ge=1, le=100),
+    replies: int = Query(3, ge=0, le=20),
+    cursor: Optional[str] = Query(None)
+):
+    """Get a page of root comments with their first replies"""
+    try:
+        return await CommentService.get_thread_page(
+            answer_id, limit=limit, reply_limit=replies, cursor=cursor
+        )
+    except Exception as e:
+        logger.error(f"Get comment thread page error: {e}")
+        raise
+
+@router.get("/{comment_id}/replies", response_model=CommentThreadPage)
+async def get_comment_replies(
+    comment_id: str,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None)
+):
+    """Get a page of direct replies to a comment"""
+    page = await CommentService.get_reply_page(comment_id, limit=limit, cursor=cursor)
+    if page is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Comment not found"
+        )
+    return page
+
+@router.get("/{comment_id}/thread", response_model=CommentThread)
+async def get_comment_subtree(
+    comment_id: str,
+    max_depth: Optional[int] = Query(None, ge=0)
+):
+    """Get a comment with its replies nested below it"""
+    thread = await CommentService.get_comment_subtree(comment_id, max_depth=max_depth)
+    if not thread:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Comment not found"
+        )
+    return thread
+
 @router.get("/{comment_id}", response_model=CommentResponse)
 async def get_comment(comment_id: str):
     """Get a specific comment"""
@@ -83,7 +131,7 @@ async def delete_comment(
         logger.error(f"Comment deletion error: {e}")
         raise
 
-@router.get("/user/{user_id}", response_model=List[CommentWithUser])
+@router.get("/user/{user_id}", response_model=List[CommentWithAnswer])
 async def get_comments_by_user(
     user_id: str,
     skip: int = Query(0, ge=0),
@@ -99,6 +147,24 @@ async def get_comments_by_user(
         logger.error(f"Get user comments error: {e}")
         raise
 
+@router.get("/answers/counts")
+async def get_comment_counts(
+    answer_ids: Optional[List[str]] = Query(None)
+):
+    """Get comment counts for several answers at once"""
+    if not answer_ids or len(answer_ids) > 100:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide between 1 and 100 answer_ids"
+        )
+    
+    try:
+        counts = await CommentService.get_comment_counts(answer_ids)
+        return {"counts": counts}
+    except Exception as e:
+        logger.error(f"Get comment counts error: {e}")
+        raise
+
 @router.get("/answer/{answer_id}/count")
 async def get_comment_count(answer_id: str):
     """Get total comment count for an answer"""
@@ -113,11 +179,15 @@ async def get_comment_count(answer_id: str):
 async def search_comments(
     q: str = Query(..., min_length=1),
     skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100)
+    limit: int = Query(20, ge=1, le=100),
+    answer_id: Optional[str] = Query(None),
+    user_id: Optional[str] = Query(None)
 ):
-    """Search comments by text content"""
+    """Search comments by text content, optionally within an answer or by a user"""
     try:
-        comments = await CommentService.search_comments(q, skip=skip, limit=limit)
+        comments = await CommentService.search_comments(
+            q, skip=skip, limit=limit, answer_id=answer_id, user_id=user_id
+        )
         return comments
     except Exception as e:
         logger.error(f"Search comments error: {e}")
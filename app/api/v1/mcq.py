@@ -5,7 +5,8 @@ from app.schemas.mcq import (
     QuizSubmission, QuizResult, TopicStats
 )
 from app.services.mcq_service import MCQService
-from app.core.auth import get_current_active_user
+from app.services.question_bank import question_bank
+from app.core.auth import get_current_active_user, get_current_admin_user
 from app.models.user import User
 from app.utils.logger import get_logger
 
@@ -73,7 +74,7 @@ async def get_quiz_questions(
         )
     
     try:
-        questions = await MCQService.get_quiz_questions(quiz_id)
+        questions = await MCQService.get_quiz_questions(quiz)
         return questions
     except Exception as e:
         logger.error(f"Get quiz questions error: {e}")
@@ -118,6 +119,21 @@ async def get_available_topics():
         logger.error(f"Get topics error: {e}")
         raise
 
+@router.post("/bank/reload")
+async def reload_question_bank(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Reload the question bank file without a restart (admin only)"""
+    try:
+        await question_bank.reload(force=True)
+        return question_bank.stats()
+    except Exception as e:
+        logger.error(f"Question bank reload error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Question bank reload failed; the previous bank is still in use"
+        )
+
 @router.get("/topics/{topic}/stats", response_model=TopicStats)
 async def get_topic_stats(
     topic: str,
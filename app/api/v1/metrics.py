@@ -1,11 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import List
+from typing import List, Optional
+from datetime import datetime
 from app.schemas.metrics import (
     UserMetrics, PopularUser, QuestionMetrics, PopularQuestion,
-    EngagementStats, UserActivity
+    EngagementStats, UserActivity, ActivityStats
 )
 from app.services.metrics_service import MetricsService
-from app.core.auth import get_current_active_user
+from app.services.activity_service import ActivityService
+from app.services.view_service import view_counter
+from app.core.auth import get_current_active_user, get_current_admin_user
+from app.core.cache import cache
+from app.core.snapshots import snapshots
+from app.core.jobs import jobs
+from app.core.notification_hub import notification_hub
+from app.services.retention_service import notification_retention
+from app.services.question_bank import question_bank
+from app.utils.singleflight import singleflight_stats
 from app.models.user import User
 from app.utils.logger import get_logger
 
@@ -19,8 +29,8 @@ async def get_popular_users(
 ):
     """Get most popular users by reputation score"""
     try:
-        popular_users = await MetricsService.get_popular_users(limit)
-        return popular_users
+        popular_users = await snapshots.get("metrics.popular_users")
+        return popular_users[:limit]
     except Exception as e:
         logger.error(f"Get popular users error: {e}")
         raise
@@ -31,8 +41,8 @@ async def get_most_active_users(
 ):
     """Get most active users this week"""
     try:
-        active_users = await MetricsService.get_most_active_users(limit)
-        return active_users
+        active_users = await snapshots.get("metrics.active_users")
+        return active_users[:limit]
     except Exception as e:
         logger.error(f"Get active users error: {e}")
         raise
@@ -74,8 +84,8 @@ async def get_popular_questions(
 ):
     """Get most popular questions by engagement score"""
     try:
-        popular_questions = await MetricsService.get_popular_questions(limit, period)
-        return popular_questions
+        popular_questions = await snapshots.get(f"metrics.popular_questions.{period}")
+        return popular_questions[:limit]
     except Exception as e:
         logger.error(f"Get popular questions error: {e}")
         raise
@@ -86,8 +96,8 @@ async def get_top_questions(
 ):
     """Get top questions by vote score (all time)"""
     try:
-        top_questions = await MetricsService.get_top_questions(limit)
-        return top_questions
+        top_questions = await snapshots.get("metrics.popular_questions.all")
+        return top_questions[:limit]
     except Exception as e:
         logger.error(f"Get top questions error: {e}")
         raise
@@ -96,10 +106,10 @@ async def get_top_questions(
 async def get_trending_questions(
     limit: int = Query(20, ge=1, le=100)
 ):
-    """Get trending questions from the last week"""
+    """Get trending questions by time-decayed hot score"""
     try:
-        trending_questions = await MetricsService.get_trending_questions(limit)
-        return trending_questions
+        trending_questions = await snapshots.get("metrics.trending_questions")
+        return trending_questions[:limit]
     except Exception as e:
         logger.error(f"Get trending questions error: {e}")
         raise
@@ -123,12 +133,37 @@ async def get_question_metrics(question_id: str):
 async def get_engagement_stats():
     """Get overall platform engagement statistics"""
     try:
-        stats = await MetricsService.get_engagement_stats()
+        stats = await snapshots.get("metrics.engagement")
         return stats
     except Exception as e:
         logger.error(f"Get engagement stats error: {e}")
         raise
 
+@router.get("/activity", response_model=ActivityStats)
+async def get_activity_stats(
+    period: str = Query("today", regex="^(today|week|month)$"),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None)
+):
+    """Get platform activity for a period, or for an explicit start/end range (UTC)"""
+    try:
+        if start:
+            if end and end <= start:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="end must be after start"
+                )
+            return await ActivityService.get_activity_stats(start, end)
+        return await ActivityService.get_period_stats(period)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Get activity stats error: {e}")
+        raise
+
 @router.get("/my-metrics", response_model=UserMetrics)
 async def get_my_metrics(
     current_user: User = Depends(get_current_active_user)
@@ -159,8 +194,8 @@ async def get_reputation_leaderboard(
 ):
     """Get reputation leaderboard (top users by reputation)"""
     try:
-        leaderboard = await MetricsService.get_popular_users(limit)
-        return leaderboard
+        leaderboard = await snapshots.get("metrics.popular_users")
+        return leaderboard[:limit]
     except Exception as e:
         logger.error(f"Get reputation leaderboard error: {e}")
         raise
@@ -171,9 +206,24 @@ async def get_activity_leaderboard(
 ):
     """Get activity leaderboard (most active users this week)"""
     try:
-        leaderboard = await MetricsService.get_most_active_users(limit)
-        return leaderboard
+        leaderboard = await snapshots.get("metrics.active_users")
+        return leaderboard[:limit]
     except Exception as e:
         logger.error(f"Get activity leaderboard error: {e}")
         raise
 
+@router.get("/system")
+async def get_system_metrics(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Get cache, request coalescing, snapshot, view counting, job queue, notification stream, retention and question bank statistics (admin only)"""
+    return {
+        "cache": cache.stats(),
+        "singleflight": singleflight_stats(),
+        "snapshots": snapshots.stats(),
+        "views": view_counter.stats(),
+        "jobs": jobs.stats(),
+        "notifications": notification_hub.stats(),
+        "retention": notification_retention.stats(),
+        "question_bank": question_bank.stats()
+    }
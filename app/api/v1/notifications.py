@@ -1,8 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import List
+import json
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 from app.schemas.notification import NotificationResponse, NotificationUpdate, NotificationStats
 from app.services.notification_service import NotificationService
-from app.core.auth import get_current_active_user
+from app.core.auth import get_current_active_user, get_user_from_token
+from app.core.config import settings
+from app.core.notification_hub import notification_hub
+from app.models.notification import NotificationCounter
 from app.models.user import User
 from app.utils.logger import get_logger
 
@@ -84,13 +89,91 @@ async def delete_notification(
 
 @router.get("/unread-count")
 async def get_unread_count(
+    wait: int = Query(0, ge=0, le=settings.notification_long_poll_max_seconds),
+    since: Optional[int] = Query(None),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get count of unread notifications"""
+    """Get count of unread notifications
+    
+    With wait and since (the version from a previous response), the request is
+    held until the count changes or wait seconds pass.
+    """
     try:
-        stats = await NotificationService.get_notification_stats(current_user.id)
-        return {"unread_count": stats["unread_count"]}
+        return await NotificationService.wait_for_unread_count(current_user.id, since, wait)
     except Exception as e:
         logger.error(f"Get unread count error: {e}")
         raise
 
+
+def _stream_token(token: Optional[str], authorization: Optional[str]) -> Optional[str]:
+    """Browsers cannot set headers on EventSource/WebSocket, so a token query parameter is accepted too"""
+    if token:
+        return token
+    if authorization and authorization.lower().startswith("bearer "):
+        return authorization[7:]
+    return None
+
+def _unread_count_event(counter: NotificationCounter) -> dict:
+    return {"type": "unread_count", "unread_count": max(counter.unread, 0), "version": counter.version}
+
+@router.websocket("/stream")
+async def notification_websocket(websocket: WebSocket, token: Optional[str] = Query(None)):
+    """Push new notifications and unread counts over a WebSocket"""
+    user = await get_user_from_token(_stream_token(token, websocket.headers.get("authorization")))
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    subscription = notification_hub.subscribe(user.id)
+    try:
+        counter = await NotificationService.get_counter(user.id)
+        await websocket.send_json(_unread_count_event(counter))
+        
+        while not subscription.overflowed.is_set():
+            event = await subscription.next_event(settings.notification_heartbeat_seconds)
+            await websocket.send_json(event if event is not None else {"type": "heartbeat"})
+        
+        # Too far behind to catch up; the client reconnects and refetches
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Notification websocket error: {e}")
+    finally:
+        notification_hub.unsubscribe(subscription)
+
+@router.get("/stream")
+async def notification_event_stream(request: Request, token: Optional[str] = Query(None)):
+    """Push new notifications and unread counts as server-sent events"""
+    user = await get_user_from_token(_stream_token(token, request.headers.get("authorization")))
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    async def events():
+        # Subscribed before the count is read so no event in between is missed
+        subscription = notification_hub.subscribe(user.id)
+        try:
+            counter = await NotificationService.get_counter(user.id)
+            yield f"event: unread_count\ndata: {json.dumps(_unread_count_event(counter))}\n\n"
+            while not subscription.overflowed.is_set():
+                event = await subscription.next_event(settings.notification_heartbeat_seconds)
+                if await request.is_disconnected():
+                    break
+                if event is None:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": heartbeat\n\n"
+                else:
+                    yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+        finally:
+            notification_hub.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
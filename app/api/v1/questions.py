@@ -28,15 +28,17 @@ async def get_questions(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     tags: Optional[List[str]] = Query(None),
-    search: Optional[str] = Query(None)
+    search: Optional[str] = Query(None),
+    sort: str = Query("newest", regex="^(newest|hot)$")
 ):
-    """Get questions with optional filtering"""
+    """Get questions with optional filtering, sorted by newest or hot"""
     try:
         questions = await QuestionService.get_questions(
             skip=skip,
             limit=limit,
             tags=tags,
-            search=search
+            search=search,
+            sort=sort
         )
         return questions
     except Exception as e:
@@ -31,7 +31,7 @@ async def update_my_profile(
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user_by_id(user_id: str):
     """Get user by ID (public endpoint)"""
-    user = await UserService.get_user_by_id(user_id)
+    user = await UserService.get_user_profile(user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
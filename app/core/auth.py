@@ -3,6 +3,7 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
 from app.core.security import verify_token
 from app.models.user import User
+from app.services.user_service import UserService
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -31,12 +32,31 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         logger.error(f"Token validation error: {e}")
         raise credentials_exception
     
-    user = await User.get(user_id)
+    user = await UserService.get_user_by_id(user_id)
     if user is None:
         raise credentials_exception
     
     return user
 
+async def get_user_from_token(token: Optional[str]) -> Optional[User]:
+    """Resolve a raw bearer token to its user, for connections without an Authorization dependency"""
+    if not token:
+        return None
+    
+    try:
+        payload = verify_token(token)
+        if payload is None:
+            return None
+        
+        user_id: str = payload.get("sub")
+        if user_id is None:
+            return None
+    except Exception as e:
+        logger.error(f"Token validation error: {e}")
+        return None
+    
+    return await UserService.get_user_by_id(user_id)
+
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """Get current active user"""
     return current_user
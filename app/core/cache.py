@@ -0,0 +1,493 @@
+import asyncio
+import functools
+import json
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+MessageHandler = Callable[[str], Awaitable[None]]
+
+class CacheBackend:
+    """Key-value store with TTLs, tag invalidation and pub/sub"""
+
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None, tags: Iterable[str] = ()):
+        raise NotImplementedError
+
+    async def delete(self, *keys: str) -> int:
+        raise NotImplementedError
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        raise NotImplementedError
+
+    async def publish(self, channel: str, message: str):
+        raise NotImplementedError
+
+    async def subscribe(self, channel: str, handler: MessageHandler):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": type(self).__name__}
+
+class MemoryCacheBackend(CacheBackend):
+    """Size-bounded in-process LRU; pub/sub only reaches this process"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[bytes, Optional[float], Set[str]]]" = OrderedDict()
+        self._tag_index: Dict[str, Set[str]] = {}
+        self._handlers: Dict[str, List[MessageHandler]] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        value, expires_at, _ = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None, tags: Iterable[str] = ()):
+        self._remove(key)
+        expires_at = time.monotonic() + ttl if ttl else None
+        tag_set = set(tags)
+        self._entries[key] = (value, expires_at, tag_set)
+        for tag in tag_set:
+            self._tag_index.setdefault(tag, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    async def delete(self, *keys: str) -> int:
+        return sum(1 for key in keys if self._remove(key))
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        removed = 0
+        for tag in tags:
+            for key in self._tag_index.pop(tag, set()):
+                if self._remove(key):
+                    removed += 1
+        return removed
+
+    async def publish(self, channel: str, message: str):
+        for handler in self._handlers.get(channel, []):
+            try:
+                await handler(message)
+            except Exception as e:
+                logger.error(f"Cache message handler error on {channel}: {e}")
+
+    async def subscribe(self, channel: str, handler: MessageHandler):
+        self._handlers.setdefault(channel, []).append(handler)
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self).__name__,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries
+        }
+
+    def _remove(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+
+        for tag in entry[2]:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+        return True
+
+class RedisError(Exception):
+    """Error reply from a Redis-compatible server"""
+
+class RedisConnection:
+    """A single RESP2 connection"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @staticmethod
+    def encode(*args) -> bytes:
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode("utf-8")
+            parts.append(f"${len(arg)}\r\n".encode())
+            parts.append(arg)
+            parts.append(b"\r\n")
+        return b"".join(parts)
+
+    async def send(self, *commands: Tuple):
+        self.writer.write(b"".join(self.encode(*command) for command in commands))
+        await self.writer.drain()
+
+    async def read_reply(self) -> Any:
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by cache server")
+
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b"+":
+            return payload.decode()
+        if prefix == b"-":
+            return RedisError(payload.decode())
+        if prefix == b":":
+            return int(payload)
+        if prefix == b"$":
+            length = int(payload)
+            if length == -1:
+                return None
+            data = await self.reader.readexactly(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            length = int(payload)
+            if length == -1:
+                return None
+            return [await self.read_reply() for _ in range(length)]
+
+        raise RedisError(f"Unexpected reply prefix: {prefix!r}")
+
+    async def execute(self, *commands: Tuple) -> List[Any]:
+        """Pipeline commands and return their replies in order"""
+        await self.send(*commands)
+        replies = [await self.read_reply() for _ in commands]
+        for reply in replies:
+            if isinstance(reply, RedisError):
+                raise reply
+        return replies
+
+    def close(self):
+        self.writer.close()
+
+class RedisCacheBackend(CacheBackend):
+    """Networked backend speaking the Redis protocol (RESP2)"""
+
+    def __init__(self, url: str, pool_size: int = 8, timeout: float = 2.0, tag_ttl: int = 86400):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.pool_size = pool_size
+        self.timeout = timeout
+        # Tag sets outlive the entries they index; keep this above every entry TTL
+        self.tag_ttl = tag_ttl
+        self._idle: List[RedisConnection] = []
+        self._slots = asyncio.Semaphore(pool_size)
+        self._handlers: Dict[str, List[MessageHandler]] = {}
+        self._subscriber_task: Optional[asyncio.Task] = None
+
+    async def _connect(self) -> RedisConnection:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        connection = RedisConnection(reader, writer)
+        setup = []
+        if self.password:
+            setup.append(("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            await connection.execute(*setup)
+        return connection
+
+    async def execute(self, *commands: Tuple) -> List[Any]:
+        """Run a pipeline of commands on a pooled connection"""
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else await self._connect()
+            try:
+                replies = await asyncio.wait_for(connection.execute(*commands), self.timeout)
+            except RedisError:
+                self._idle.append(connection)
+                raise
+            except BaseException:
+                # The connection may hold unread replies, so it cannot be reused
+                connection.close()
+                raise
+            self._idle.append(connection)
+            return replies
+
+    async def get(self, key: str) -> Optional[bytes]:
+        (value,) = await self.execute(("GET", key))
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None, tags: Iterable[str] = ()):
+        command = ("SET", key, value, "PX", int(ttl * 1000)) if ttl else ("SET", key, value)
+        commands = [command]
+        for tag in tags:
+            commands.append(("SADD", f"tag:{tag}", key))
+            commands.append(("EXPIRE", f"tag:{tag}", self.tag_ttl))
+        await self.execute(*commands)
+
+    async def delete(self, *keys: str) -> int:
+        if not keys:
+            return 0
+        (removed,) = await self.execute(("DEL", *keys))
+        return removed
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        if not tags:
+            return 0
+
+        members = await self.execute(*[("SMEMBERS", f"tag:{tag}") for tag in tags])
+        keys = {key for tag_keys in members for key in tag_keys}
+        await self.delete(*keys, *[f"tag:{tag}" for tag in tags])
+        return len(keys)
+
+    async def publish(self, channel: str, message: str):
+        await self.execute(("PUBLISH", channel, message))
+
+    async def subscribe(self, channel: str, handler: MessageHandler):
+        self._handlers.setdefault(channel, []).append(handler)
+
+        # Restart the listener so it subscribes to the new channel as well
+        if self._subscriber_task is not None:
+            self._subscriber_task.cancel()
+        self._subscriber_task = asyncio.create_task(self._listen())
+
+    async def _listen(self):
+        while True:
+            connection = None
+            try:
+                connection = await self._connect()
+                await connection.send(("SUBSCRIBE", *self._handlers.keys()))
+                while True:
+                    reply = await connection.read_reply()
+                    if not isinstance(reply, list) or reply[0] != b"message":
+                        continue
+
+                    channel = reply[1].decode()
+                    message = reply[2].decode()
+                    for handler in self._handlers.get(channel, []):
+                        try:
+                            await handler(message)
+                        except Exception as e:
+                            logger.error(f"Cache message handler error on {channel}: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Cache subscriber error, reconnecting: {e}")
+                await asyncio.sleep(1)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+    async def close(self):
+        if self._subscriber_task is not None:
+            self._subscriber_task.cancel()
+            self._subscriber_task = None
+        while self._idle:
+            self._idle.pop().close()
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self).__name__,
+            "host": self.host,
+            "port": self.port,
+            "idle_connections": len(self._idle)
+        }
+
+def create_cache_backend(url: str) -> CacheBackend:
+    """Create a backend from a URL: memory:// or redis://[:password@]host[:port][/db]"""
+    scheme = urlparse(url).scheme
+    if scheme == "memory":
+        return MemoryCacheBackend(max_entries=settings.cache_max_entries)
+    if scheme == "redis":
+        return RedisCacheBackend(
+            url,
+            pool_size=settings.cache_pool_size,
+            timeout=settings.cache_timeout_seconds,
+            tag_ttl=settings.cache_tag_ttl_seconds
+        )
+    raise ValueError(f"Unsupported cache URL scheme: {scheme}")
+
+class Cache:
+    """JSON cache facade with namespacing and cross-worker tag invalidation
+
+    With a shared backend, entries are also kept in a short-lived local layer;
+    invalidations are published so every worker drops its local copies.
+    """
+
+    INVALIDATION_CHANNEL = "invalidate"
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        namespace: str = "stackit",
+        default_ttl: float = 60,
+        local: Optional[MemoryCacheBackend] = None,
+        local_ttl: float = 5
+    ):
+        self.backend = backend
+        self.namespace = namespace
+        self.default_ttl = default_ttl
+        self.local = local
+        self.local_ttl = local_ttl
+        self.origin = uuid.uuid4().hex
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _tags(self, tags: Iterable[str]) -> List[str]:
+        return [f"{self.namespace}:{tag}" for tag in tags]
+
+    @property
+    def channel(self) -> str:
+        return f"{self.namespace}:{self.INVALIDATION_CHANNEL}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Get a cached value, or None on a miss"""
+        full_key = self._key(key)
+        try:
+            raw = await self.local.get(full_key) if self.local else None
+            if raw is None:
+                raw = await self.backend.get(full_key)
+                if raw is not None and self.local:
+                    # Keep the tags locally so published invalidations reach this copy
+                    await self.local.set(full_key, raw, self.local_ttl, json.loads(raw)["tags"])
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache get failed for {key}: {e}")
+            raw = None
+
+        if raw is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return json.loads(raw)["value"]
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()):
+        """Cache a JSON-serializable value under the given resource tags"""
+        full_key = self._key(key)
+        full_tags = self._tags(tags)
+        raw = json.dumps({"tags": full_tags, "value": jsonable_encoder(value)}).encode("utf-8")
+        try:
+            await self.backend.set(full_key, raw, ttl or self.default_ttl, full_tags)
+            if self.local:
+                await self.local.set(full_key, raw, min(self.local_ttl, ttl or self.default_ttl), full_tags)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache set failed for {key}: {e}")
+
+    async def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+        tags: Iterable[str] = ()
+    ) -> Any:
+        """Get a cached value, computing and caching it on a miss"""
+        value = await self.get(key)
+        if value is not None:
+            return value
+
+        value = jsonable_encoder(await loader())
+        if value is not None:
+            await self.set(key, value, ttl, tags)
+        return value
+
+    async def delete(self, key: str):
+        """Delete a single cached value"""
+        full_key = self._key(key)
+        try:
+            await self.backend.delete(full_key)
+            if self.local:
+                await self.local.delete(full_key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache delete failed for {key}: {e}")
+
+    async def invalidate(self, *tags: str):
+        """Drop every entry carrying any of the tags, on all workers"""
+        full_tags = self._tags(tags)
+        if self.local:
+            await self.local.invalidate_tags(*full_tags)
+        try:
+            await self.backend.invalidate_tags(*full_tags)
+            if self.local:
+                await self.backend.publish(
+                    self.channel, json.dumps({"origin": self.origin, "tags": full_tags})
+                )
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Cache invalidation failed for {tags}: {e}")
+
+    async def publish(self, channel: str, message: str):
+        """Publish a message to every worker subscribed to a namespaced channel"""
+        await self.backend.publish(self._key(channel), message)
+
+    async def subscribe(self, channel: str, handler: MessageHandler):
+        await self.backend.subscribe(self._key(channel), handler)
+
+    async def _on_invalidation(self, message: str):
+        payload = json.loads(message)
+        if payload.get("origin") != self.origin and self.local:
+            await self.local.invalidate_tags(*payload.get("tags", []))
+
+    async def start(self):
+        """Start listening for invalidations published by other workers"""
+        if self.local:
+            await self.backend.subscribe(self.channel, self._on_invalidation)
+
+    async def close(self):
+        await self.backend.close()
+
+    def stats(self) -> dict:
+        """Get cache usage statistics"""
+        return {
+            **self.backend.stats(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "local_entries": self.local.stats()["entries"] if self.local else None
+        }
+
+def create_cache() -> Cache:
+    backend = create_cache_backend(settings.cache_url)
+    local = None
+    if not isinstance(backend, MemoryCacheBackend):
+        local = MemoryCacheBackend(max_entries=settings.cache_local_max_entries)
+    return Cache(
+        backend,
+        namespace=settings.cache_namespace,
+        default_ttl=settings.cache_default_ttl_seconds,
+        local=local,
+        local_ttl=settings.cache_local_ttl_seconds
+    )
+
+cache = create_cache()
+
+def cached(prefix: str, tags: Iterable[str] = (), ttl: Optional[float] = None):
+    """Cache an async function's JSON-encoded result, keyed on its arguments"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = ":".join([prefix, *map(str, args), *(f"{k}={v}" for k, v in sorted(kwargs.items()))])
+            return await cache.get_or_set(key, lambda: func(*args, **kwargs), ttl, tags)
+        return wrapper
+    return decorator
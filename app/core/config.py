@@ -24,6 +24,71 @@ class Settings(BaseSettings):
     max_file_size: int = 5242880  # 5MB
     upload_dir: str = "uploads"
     
+    # Cache (memory:// or redis://[:password@]host[:port][/db])
+    cache_url: str = "memory://"
+    cache_namespace: str = "stackit"
+    cache_default_ttl_seconds: int = 60
+    cache_max_entries: int = 10000
+    cache_local_max_entries: int = 2000
+    cache_local_ttl_seconds: int = 5
+    cache_pool_size: int = 8
+    cache_timeout_seconds: float = 2.0
+    cache_tag_ttl_seconds: int = 86400
+    
+    # Metrics snapshots (stale-while-revalidate)
+    snapshot_tick_seconds: int = 5
+    snapshot_timeout_seconds: int = 30
+    snapshot_engagement_interval_seconds: int = 30
+    snapshot_questions_interval_seconds: int = 120
+    snapshot_users_interval_seconds: int = 300
+    
+    # Response cache
+    response_cache_enabled: bool = True
+    response_cache_ttl_seconds: int = 60
+    response_cache_client_max_age: int = 0
+    
+    # View counting
+    view_flush_interval_seconds: int = 10
+    view_dedupe_window_seconds: int = 1800
+    view_dedupe_max_entries: int = 100000
+    # Reverse proxies in front of the app that append to X-Forwarded-For; 0 ignores the header
+    view_trusted_proxy_count: int = 0
+    
+    # Hot ranking
+    hot_half_life_hours: float = 24
+    
+    # Background jobs
+    job_queue_size: int = 10000
+    job_workers: int = 4
+    job_max_retries: int = 3
+    job_retry_delay_seconds: float = 0.5
+    job_drain_timeout_seconds: float = 10
+    
+    # Notifications
+    notification_fanout_chunk_size: int = 1000
+    notification_coalesce_enabled: bool = True
+    notification_coalesce_window_seconds: int = 3600
+    notification_recent_actors: int = 3
+    notification_stream_queue_size: int = 100
+    notification_heartbeat_seconds: int = 25
+    notification_long_poll_max_seconds: int = 60
+    
+    # Notification retention (0 days keeps notifications forever)
+    notification_read_retention_days: int = 30
+    notification_unread_retention_days: int = 180
+    notification_retention_sweep_interval_seconds: int = 300
+    notification_retention_batch_size: int = 1000
+    notification_ttl_grace_seconds: int = 86400
+    notification_archive_enabled: bool = False
+    notification_archive_dir: str = "archive/notifications"
+    
+    # MCQ question bank
+    # The bundled bank, wherever the app is started from
+    mcq_question_bank_path: str = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "mcq_questions.yaml"
+    )
+    mcq_question_bank_reload_seconds: int = 30
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -0,0 +1,158 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, List, Optional
+
+from app.core.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class Job:
+    """A unit of background work and its delivery bookkeeping"""
+
+    def __init__(self, name: str, fn: Callable[..., Awaitable[Any]], args: tuple, kwargs: dict):
+        self.name = name
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.attempts = 0
+        self.enqueued_at = time.monotonic()
+
+class JobQueue:
+    """Bounded in-process queue of async jobs run by a pool of workers
+
+    Submitting never blocks: when the queue is full the job is dropped and
+    counted. Failed jobs are retried with exponential backoff, and stopping
+    drains the queue before the workers exit.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10000,
+        workers: int = 4,
+        max_retries: int = 3,
+        retry_delay: float = 0.5,
+        drain_timeout: float = 10
+    ):
+        self.maxsize = maxsize
+        self.worker_count = workers
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.drain_timeout = drain_timeout
+        self._queue: Optional[asyncio.Queue] = None
+        # Enqueue times of queued jobs, oldest first, mirroring the FIFO queue
+        self._enqueued: Deque[float] = deque()
+        self._workers: List[asyncio.Task] = []
+        self._accepting = True
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self.rejected = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    @property
+    def queue(self) -> asyncio.Queue:
+        # Created lazily so it binds to the running event loop
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+        return self._queue
+
+    def submit(self, name: str, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> bool:
+        """Queue fn(*args, **kwargs); returns False if the job was rejected"""
+        if not self._accepting:
+            self.rejected += 1
+            logger.warning(f"Job {name} rejected: queue is draining")
+            return False
+
+        job = Job(name, fn, args, kwargs)
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            logger.error(f"Job {name} rejected: queue is full ({self.maxsize})")
+            return False
+
+        self._enqueued.append(job.enqueued_at)
+        self.submitted += 1
+        return True
+
+    async def _run_job(self, job: Job):
+        lag = time.monotonic() - job.enqueued_at
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+
+        while True:
+            job.attempts += 1
+            try:
+                await job.fn(*job.args, **job.kwargs)
+                self.completed += 1
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if job.attempts > self.max_retries:
+                    self.failed += 1
+                    logger.error(f"Job {job.name} failed after {job.attempts} attempts: {e}")
+                    return
+                self.retried += 1
+                logger.warning(f"Job {job.name} attempt {job.attempts} failed, retrying: {e}")
+                await asyncio.sleep(self.retry_delay * 2 ** (job.attempts - 1))
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            self._enqueued.popleft()
+            try:
+                await self._run_job(job)
+            finally:
+                self.queue.task_done()
+
+    async def start(self):
+        """Start the worker tasks"""
+        if not self._workers:
+            self._accepting = True
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+            logger.info(f"Job queue started with {self.worker_count} workers")
+
+    async def stop(self):
+        """Stop accepting jobs, drain the queue, then stop the workers"""
+        self._accepting = False
+        if self._workers:
+            try:
+                await asyncio.wait_for(self.queue.join(), self.drain_timeout)
+            except asyncio.TimeoutError:
+                logger.error(f"Job queue drain timed out with {self.queue.qsize()} jobs left")
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def stats(self) -> dict:
+        """Get queue depth, lag and outcome counts"""
+        oldest_lag = time.monotonic() - self._enqueued[0] if self._enqueued else 0.0
+
+        return {
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "capacity": self.maxsize,
+            "workers": len(self._workers),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retried": self.retried,
+            "rejected": self.rejected,
+            "oldest_lag_seconds": round(oldest_lag, 3),
+            "last_lag_seconds": round(self.last_lag, 3),
+            "max_lag_seconds": round(self.max_lag, 3)
+        }
+
+jobs = JobQueue(
+    maxsize=settings.job_queue_size,
+    workers=settings.job_workers,
+    max_retries=settings.job_max_retries,
+    retry_delay=settings.job_retry_delay_seconds,
+    drain_timeout=settings.job_drain_timeout_seconds
+)
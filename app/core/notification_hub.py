@@ -0,0 +1,163 @@
+import asyncio
+import json
+import uuid
+from typing import Any, Dict, List, Optional, Set
+
+from app.core.cache import Cache, cache
+from app.core.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class Subscription:
+    """One open stream: a bounded queue of events for a single user
+
+    A subscriber that falls behind by more than its queue is marked overflowed
+    and should be closed; the client reconnects and refetches its state.
+    """
+
+    def __init__(self, user_id: str, maxsize: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = asyncio.Event()
+
+    def offer(self, event: dict) -> bool:
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.overflowed.set()
+            return False
+
+    async def next_event(self, timeout: float) -> Optional[dict]:
+        """Wait for the next event; None on timeout (time for a heartbeat)"""
+        get = asyncio.ensure_future(self.queue.get())
+        overflow = asyncio.ensure_future(self.overflowed.wait())
+        done, pending = await asyncio.wait({get, overflow}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        if get in done:
+            return get.result()
+        return None
+
+class NotificationHub:
+    """Push notification events to the streams open on this worker
+
+    Long-polling requests wait on one-shot futures resolved by the next unread
+    count event for their user. Events are also published on the cache's pub/sub channel so streams held by
+    other workers receive them when the cache backend is shared.
+    """
+
+    CHANNEL = "notifications"
+
+    def __init__(self, cache: Cache, queue_size: int = 100):
+        self.cache = cache
+        self.queue_size = queue_size
+        self.origin = uuid.uuid4().hex
+        self._subscriptions: Dict[str, Set[Subscription]] = {}
+        self._waiters: Dict[str, Set[asyncio.Future]] = {}
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, user_id: str) -> Subscription:
+        subscription = Subscription(user_id, self.queue_size)
+        self._subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscriptions = self._subscriptions.get(subscription.user_id)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.user_id]
+
+    def watch(self, user_id: str) -> asyncio.Future:
+        """Register a one-shot waiter resolved by the user's next unread count change"""
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(user_id, set()).add(waiter)
+        return waiter
+
+    def unwatch(self, user_id: str, waiter: asyncio.Future):
+        waiters = self._waiters.get(user_id)
+        if waiters is not None:
+            waiters.discard(waiter)
+            if not waiters:
+                del self._waiters[user_id]
+
+    async def wait(self, waiter: asyncio.Future, timeout: float) -> Optional[dict]:
+        """Wait for a watched change; None on timeout"""
+        try:
+            return await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def _deliver(self, events: Dict[str, dict]):
+        for user_id, event in events.items():
+            if event.get("type") == "unread_count":
+                # Waiters are one-shot, so the whole set is resolved and dropped
+                for waiter in self._waiters.pop(user_id, ()):
+                    if not waiter.done():
+                        waiter.set_result(event)
+            for subscription in self._subscriptions.get(user_id, ()):
+                if subscription.offer(event):
+                    self.delivered += 1
+                else:
+                    self.dropped += 1
+
+    def listeners(self, user_ids: List[str]) -> List[str]:
+        """Users whose events could reach an open stream, on this or another worker"""
+        if self.cache.local is not None:
+            return list(user_ids)
+        return [user_id for user_id in user_ids if self._listening(user_id)]
+
+    def _listening(self, user_id: str) -> bool:
+        return user_id in self._subscriptions or user_id in self._waiters
+
+    async def publish(self, events: Dict[str, Dict[str, Any]]):
+        """Send each user's event to all of their streams, on all workers"""
+        # Only a shared backend can reach other workers
+        shared = self.cache.local is not None
+        local_events = {
+            user_id: event for user_id, event in events.items() if self._listening(user_id)
+        }
+        if not shared and not local_events:
+            return
+
+        self.published += len(events)
+        if local_events:
+            # Serialized like a remote message so every stream sees the same payload
+            self._deliver(json.loads(json.dumps(local_events, default=str)))
+
+        if shared:
+            try:
+                await self.cache.publish(self.CHANNEL, json.dumps(
+                    {"origin": self.origin, "events": events}, default=str
+                ))
+            except Exception as e:
+                logger.error(f"Notification event publish failed: {e}")
+
+    async def publish_to(self, user_id: str, event: Dict[str, Any]):
+        await self.publish({user_id: event})
+
+    async def _on_message(self, message: str):
+        payload = json.loads(message)
+        if payload.get("origin") != self.origin:
+            self._deliver(payload.get("events", {}))
+
+    async def start(self):
+        """Start receiving events published by other workers"""
+        if self.cache.local is not None:
+            await self.cache.subscribe(self.CHANNEL, self._on_message)
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._subscriptions),
+            "connections": sum(len(subscriptions) for subscriptions in self._subscriptions.values()),
+            "waiters": sum(len(waiters) for waiters in self._waiters.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped
+        }
+
+notification_hub = NotificationHub(cache, queue_size=settings.notification_stream_queue_size)
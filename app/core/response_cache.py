@@ -0,0 +1,141 @@
+import hashlib
+import re
+from typing import List, Optional, Set
+
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+
+from app.core.cache import Cache
+from app.core.config import settings
+from app.core.security import verify_token
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class CacheRule:
+    """A cacheable GET route and the resource tags its responses depend on"""
+
+    def __init__(self, pattern: str, tags: List[str], ttl: Optional[int] = None):
+        self.pattern = re.compile(pattern)
+        self.tags = tags
+        self.ttl = ttl
+
+    def match(self, path: str) -> Optional[Set[str]]:
+        """Return the resolved tags if the path matches this rule"""
+        match = self.pattern.match(path)
+        if not match:
+            return None
+        return {tag.format(**match.groupdict()) for tag in self.tags}
+
+# Resource tags are invalidated by the services whenever they write
+CACHE_RULES = [
+    CacheRule(r"^/api/v1/questions/?$", ["questions"]),
+    CacheRule(r"^/api/v1/questions/(?P<question_id>[^/]+)$", ["question:{question_id}", "users"]),
+    CacheRule(r"^/api/v1/tags/popular$", ["tags"]),
+    CacheRule(r"^/api/v1/metrics/(?!system$).+$", ["metrics", "users"]),
+]
+
+def get_auth_scope(request: Request) -> Optional[str]:
+    """Resolve the cache scope of a request: anonymous, a user, or uncacheable"""
+    authorization = request.headers.get("authorization")
+    if not authorization:
+        return "anonymous"
+
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+
+    payload = verify_token(token)
+    if payload is None or payload.get("sub") is None:
+        return None
+
+    return f"user:{payload['sub']}"
+
+def build_cache_key(request: Request, scope: str) -> str:
+    """Build a cache key from the auth scope, path and normalized query"""
+    query = "&".join(
+        f"{key}={value}" for key, value in sorted(request.query_params.multi_items())
+    )
+    raw_key = f"{scope}|{request.url.path}|{query}"
+    return f"response:{hashlib.sha256(raw_key.encode('utf-8')).hexdigest()}"
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    """Serve cacheable GETs from the shared cache with ETag revalidation"""
+
+    def __init__(self, app, cache: Cache, rules: List[CacheRule]):
+        super().__init__(app)
+        self.cache = cache
+        self.rules = rules
+
+    async def dispatch(self, request: Request, call_next):
+        if request.method != "GET":
+            return await call_next(request)
+
+        path = request.url.path
+        rule = None
+        tags = None
+        for candidate in self.rules:
+            tags = candidate.match(path)
+            if tags is not None:
+                rule = candidate
+                break
+
+        if rule is None:
+            return await call_next(request)
+
+        scope = get_auth_scope(request)
+        if scope is None:
+            return await call_next(request)
+
+        key = build_cache_key(request, scope)
+        cache_control = self._cache_control(scope)
+
+        entry = await self.cache.get(key)
+        if entry is not None:
+            return self._render(request, entry, cache_control, "HIT")
+
+        response = await call_next(request)
+        if response.status_code != 200 or not response.headers.get("content-type", "").startswith("application/json"):
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        entry = {
+            "body": body.decode("utf-8"),
+            "media_type": response.headers["content-type"],
+            "etag": f'"{hashlib.sha1(body).hexdigest()}"'
+        }
+        await self.cache.set(key, entry, rule.ttl or settings.response_cache_ttl_seconds, tags)
+
+        return self._render(request, entry, cache_control, "MISS")
+
+    def _cache_control(self, scope: str) -> str:
+        visibility = "public" if scope == "anonymous" else "private"
+        return f"{visibility}, max-age={settings.response_cache_client_max_age}, must-revalidate"
+
+    def _render(self, request: Request, entry: dict, cache_control: str, cache_status: str) -> Response:
+        headers = {
+            "ETag": entry["etag"],
+            "Cache-Control": cache_control,
+            "Vary": "Authorization",
+            "X-Cache": cache_status
+        }
+
+        if etag_matches(request, entry["etag"]):
+            return Response(status_code=304, headers=headers)
+
+        return Response(
+            content=entry["body"],
+            status_code=200,
+            media_type=entry["media_type"],
+            headers=headers
+        )
@@ -0,0 +1,135 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class Snapshot:
+    """The latest good result of a periodically recomputed loader"""
+
+    def __init__(self, name: str, loader: Callable[[], Awaitable[Any]], interval: float, timeout: float):
+        self.name = name
+        self.loader = loader
+        self.interval = interval
+        self.timeout = timeout
+        self.value: Any = None
+        self.refreshed_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.refreshed_at is not None
+
+    @property
+    def age(self) -> Optional[float]:
+        if self.refreshed_at is None:
+            return None
+        return time.monotonic() - self.refreshed_at
+
+    @property
+    def stale(self) -> bool:
+        return not self.loaded or self.age >= self.interval
+
+class SnapshotScheduler:
+    """Precompute snapshots in the background and serve them stale-while-revalidate
+
+    At most one refresh per snapshot is in flight. A refresh that fails or times
+    out keeps the previous value, so a slow database never blocks readers once a
+    snapshot has loaded.
+    """
+
+    def __init__(self, tick: float = 5, timeout: float = 30):
+        self.tick = tick
+        self.timeout = timeout
+        self._snapshots: Dict[str, Snapshot] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def register(
+        self,
+        name: str,
+        loader: Callable[[], Awaitable[Any]],
+        interval: float,
+        timeout: Optional[float] = None
+    ):
+        """Register a loader to be recomputed every interval seconds"""
+        self._snapshots[name] = Snapshot(name, loader, interval, timeout or self.timeout)
+
+    async def get(self, name: str) -> Any:
+        """Get the latest snapshot, refreshing it in the background when stale"""
+        snapshot = self._snapshots[name]
+        if not snapshot.loaded:
+            # Nothing to serve yet, so wait for the (shared) first load
+            await asyncio.shield(self._trigger(snapshot))
+            if not snapshot.loaded:
+                raise RuntimeError(f"Snapshot {name} is not available: {snapshot.last_error}")
+        elif snapshot.stale:
+            self._trigger(snapshot)
+
+        return snapshot.value
+
+    def _trigger(self, snapshot: Snapshot) -> asyncio.Task:
+        if snapshot.task is None or snapshot.task.done():
+            snapshot.task = asyncio.create_task(self._refresh(snapshot))
+        return snapshot.task
+
+    async def _refresh(self, snapshot: Snapshot):
+        started = time.monotonic()
+        try:
+            snapshot.value = await asyncio.wait_for(snapshot.loader(), snapshot.timeout)
+            snapshot.refreshed_at = time.monotonic()
+            snapshot.refreshes += 1
+            snapshot.last_error = None
+            logger.debug(f"Snapshot {snapshot.name} refreshed in {snapshot.refreshed_at - started:.3f}s")
+        except Exception as e:
+            snapshot.failures += 1
+            snapshot.last_error = repr(e)
+            logger.error(f"Snapshot {snapshot.name} refresh failed, serving last good value: {snapshot.last_error}")
+
+    async def _run(self):
+        while True:
+            for snapshot in self._snapshots.values():
+                if snapshot.stale:
+                    self._trigger(snapshot)
+            await asyncio.sleep(self.tick)
+
+    async def start(self):
+        """Start the background refresh loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Snapshot scheduler started with {len(self._snapshots)} snapshots")
+
+    async def stop(self):
+        """Stop the background loop and any in-flight refreshes"""
+        tasks = [snapshot.task for snapshot in self._snapshots.values() if snapshot.task]
+        if self._task is not None:
+            tasks.append(self._task)
+            self._task = None
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, dict]:
+        """Get age and refresh counts for every snapshot"""
+        return {
+            name: {
+                "age_seconds": round(snapshot.age, 3) if snapshot.loaded else None,
+                "interval_seconds": snapshot.interval,
+                "refreshing": snapshot.task is not None and not snapshot.task.done(),
+                "refreshes": snapshot.refreshes,
+                "failures": snapshot.failures,
+                "last_error": snapshot.last_error
+            }
+            for name, snapshot in self._snapshots.items()
+        }
+
+snapshots = SnapshotScheduler(
+    tick=settings.snapshot_tick_seconds,
+    timeout=settings.snapshot_timeout_seconds
+)
@@ -0,0 +1,43 @@
+import re
+
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.config import settings
+from app.core.response_cache import get_auth_scope
+from app.services.view_service import ViewCounter
+
+QUESTION_PATH = re.compile(r"^/api/v1/questions/(?P<question_id>[^/]+)$")
+
+def get_viewer(request: Request) -> str:
+    """Identify a viewer by user when authenticated, otherwise by client IP
+
+    X-Forwarded-For is only read behind trusted proxies, and only the entry the
+    outermost of them appended: anything to its left is client-controlled.
+    """
+    scope = get_auth_scope(request)
+    if scope is not None and scope != "anonymous":
+        return scope
+
+    forwarded_for = request.headers.get("x-forwarded-for")
+    if forwarded_for and settings.view_trusted_proxy_count > 0:
+        addresses = [address.strip() for address in forwarded_for.split(",")]
+        return f"ip:{addresses[-min(settings.view_trusted_proxy_count, len(addresses))]}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+class ViewTrackingMiddleware(BaseHTTPMiddleware):
+    """Count successful question page views, including cached and 304 responses"""
+
+    def __init__(self, app, counter: ViewCounter):
+        super().__init__(app)
+        self.counter = counter
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+
+        if request.method == "GET" and response.status_code in (200, 304):
+            match = QUESTION_PATH.match(request.url.path)
+            if match:
+                self.counter.record(match.group("question_id"), get_viewer(request))
+
+        return response
@@ -22,11 +22,12 @@ async def connect_to_mongo():
         from app.models.question import Question
         from app.models.answer import Answer
         from app.models.tag import Tag
-        from app.models.vote import Vote
-        from app.models.notification import Notification
-        from app.models.mcq import MCQQuiz, MCQQuestion
+        from app.models.vote import Vote, FirstUpvote
+        from app.models.notification import Notification, NotificationCounter
+        from app.models.mcq import MCQQuiz, MCQQuestion, MCQBankQuestion, MCQSeenQuestions
         from app.models.comment import Comment
         from app.models.question_tag import QuestionTag
+        from app.models.activity import ActivityBucket
         
         # Initialize beanie with the models
         await init_beanie(
@@ -34,7 +35,9 @@ async def connect_to_mongo():
             document_models=[
                 User, Question, Answer, Tag, Vote, 
                 Notification, MCQQuiz, MCQQuestion, 
-                Comment, QuestionTag
+                Comment, QuestionTag, ActivityBucket,
+                NotificationCounter, MCQBankQuestion, MCQSeenQuestions,
+                FirstUpvote
             ]
         )
         
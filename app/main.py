@@ -4,6 +4,15 @@ from fastapi.responses import JSONResponse
 import uvicorn
 
 from app.core.config import settings
+from app.core.cache import cache
+from app.core.snapshots import snapshots
+from app.core.jobs import jobs
+from app.core.notification_hub import notification_hub
+from app.core.response_cache import ResponseCacheMiddleware, CACHE_RULES
+from app.core.view_tracking import ViewTrackingMiddleware
+from app.services.view_service import view_counter
+from app.services.retention_service import notification_retention
+from app.services.question_bank import question_bank
 from app.db.database import connect_to_mongo, close_mongo_connection
 from app.api.v1 import api_router
 from app.utils.logger import get_logger
@@ -19,6 +28,17 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Add response cache middleware (registered before CORS so cached responses get CORS headers)
+if settings.response_cache_enabled:
+    app.add_middleware(
+        ResponseCacheMiddleware,
+        cache=cache,
+        rules=CACHE_RULES,
+    )
+
+# Add view tracking middleware (outside the response cache so cache hits are counted)
+app.add_middleware(ViewTrackingMiddleware, counter=view_counter)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -33,9 +53,16 @@ app.include_router(api_router, prefix="/api/v1")
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database connection on startup"""
+    """Initialize database connection, cache, notification streams, snapshots, view counting, jobs and notification retention on startup"""
     try:
         await connect_to_mongo()
+        await question_bank.start()
+        await cache.start()
+        await notification_hub.start()
+        await snapshots.start()
+        await view_counter.start()
+        await jobs.start()
+        await notification_retention.start()
         logger.info("Application startup completed")
     except Exception as e:
         logger.error(f"Startup error: {e}")
@@ -43,8 +70,14 @@ async def startup_event():
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Close database connection on shutdown"""
+    """Stop retention, drain jobs, flush views, stop snapshots and close cache and database connection on shutdown"""
     try:
+        await notification_retention.stop()
+        await question_bank.stop()
+        await jobs.stop()
+        await view_counter.stop()
+        await snapshots.stop()
+        await cache.close()
         await close_mongo_connection()
         logger.info("Application shutdown completed")
     except Exception as e:
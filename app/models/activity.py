@@ -0,0 +1,43 @@
+from beanie import Document
+from pydantic import Field
+from pymongo import IndexModel, ASCENDING
+from typing import Dict, Optional
+from datetime import datetime
+from enum import Enum
+
+class BucketGranularity(str, Enum):
+    MINUTE = "minute"
+    HOUR = "hour"
+    DAY = "day"
+
+class ActivityType(str, Enum):
+    QUESTION = "questions"
+    ANSWER = "answers"
+    COMMENT = "comments"
+    VOTE = "votes"
+
+class ActivityBucket(Document):
+    id: str = Field(..., alias="_id")  # "<granularity>:<start>", e.g. "hour:2024-01-01T10:00"
+    granularity: BucketGranularity = Field(...)
+    start: datetime = Field(...)
+    questions: int = Field(default=0)
+    answers: int = Field(default=0)
+    comments: int = Field(default=0)
+    votes: int = Field(default=0)
+    active_users_hll: Dict[str, int] = Field(default_factory=dict)  # Sparse HyperLogLog registers
+    expires_at: Optional[datetime] = Field(default=None)
+    
+    class Settings:
+        name = "activity_buckets"
+        indexes = [
+            [("granularity", ASCENDING), ("start", ASCENDING)],
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+        ]
+    
+    class Config:
+        json_encoders = {
+            datetime: lambda v: v.isoformat()
+        }
+    
+    def __repr__(self):
+        return f"<ActivityBucket(id={self.id})>"
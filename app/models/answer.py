@@ -9,6 +9,7 @@ class Answer(Document):
     user_id: str = Field(..., index=True)
     description: str = Field(...)
     is_accepted: bool = Field(default=False)
+    comment_count: int = Field(default=0)  # Maintained by CommentService
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
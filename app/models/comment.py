@@ -1,6 +1,7 @@
 from beanie import Document
 from pydantic import Field
-from typing import Optional
+from typing import List, Optional
+from pymongo import IndexModel, TEXT
 from datetime import datetime
 import uuid
 
@@ -9,6 +10,8 @@ class Comment(Document):
     user_id: str = Field(..., index=True)
     answer_id: str = Field(..., index=True)
     parent_id: Optional[str] = Field(default=None, index=True)  # For nested comments
+    ancestors: List[str] = Field(default_factory=list)  # Root first, parent last
+    depth: int = 0
     text: str = Field(...)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     
@@ -18,7 +21,10 @@ class Comment(Document):
             "user_id",
             "answer_id",
             "parent_id",
+            "ancestors",
             "created_at",
+            IndexModel([("answer_id", 1), ("parent_id", 1), ("created_at", 1)]),
+            IndexModel([("text", TEXT)]),
         ]
     
     class Config:
@@ -1,10 +1,64 @@
 from beanie import Document
-from pydantic import Field
-from typing import List
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 import uuid
 
+class MCQBankQuestion(Document):
+    """An immutable question shared by every quiz that uses it
+    
+    The ID is a hash of the content, so the same question is stored once. The
+    bank file decides which topics use it; this copy outlives edits to the file.
+    """
+    id: str = Field(..., alias="_id")
+    question_text: str = Field(...)
+    option_a: str = Field(...)
+    option_b: str = Field(...)
+    option_c: str = Field(...)
+    option_d: str = Field(...)
+    correct_option: str = Field(...)  # 'A', 'B', 'C', or 'D'
+    difficulty: int = Field(default=2)  # 1 easy, 2 medium, 3 hard
+    
+    class Settings:
+        name = "mcq_bank"
+    
+    def __repr__(self):
+        return f"<MCQBankQuestion(id={self.id})>"
+
+class MCQSeenQuestions(Document):
+    """Which questions of a topic a user has already been given, as a bitset
+    
+    Bit i is question i of the topic's bank index; fingerprint identifies that
+    index, so the bits are discarded when the topic's questions change.
+    """
+    id: str = Field(..., alias="_id")  # "<user_id>:<topic>"
+    user_id: str = Field(..., index=True)
+    topic: str = Field(...)
+    fingerprint: str = Field(...)
+    bits: bytes = Field(default=b"")
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    class Settings:
+        name = "mcq_seen"
+        indexes = [
+            "user_id",
+        ]
+    
+    def __repr__(self):
+        return f"<MCQSeenQuestions(id={self.id})>"
+
+class MCQQuizQuestion(BaseModel):
+    """A question embedded in its quiz; only quizzes created before the question bank use these"""
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    question_text: str
+    option_a: str
+    option_b: str
+    option_c: str
+    option_d: str
+    correct_option: str  # 'A', 'B', 'C', or 'D'
+
 class MCQQuestion(Document):
+    """A question stored in its own document; only quizzes created before questions were embedded use these"""
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), alias="_id")
     quiz_id: str = Field(..., index=True)
     question_text: str = Field(...)
@@ -27,9 +81,13 @@ class MCQQuiz(Document):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), alias="_id")
     user_id: str = Field(..., index=True)
     topic: str = Field(..., index=True)
+    difficulty: Optional[str] = None
     score: int = Field(default=0)
     total_questions: int = Field(default=0)
     completed: bool = Field(default=False)
+    question_ids: List[str] = Field(default_factory=list)  # Question bank IDs
+    answers: Optional[str] = None  # Submitted options in question order, '-' if unanswered
+    questions: List[MCQQuizQuestion] = Field(default_factory=list)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     
     class Settings:
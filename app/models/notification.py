@@ -1,5 +1,7 @@
 from beanie import Document
 from pydantic import Field
+from typing import List, Optional
+from pymongo import IndexModel
 from datetime import datetime
 from enum import Enum
 import uuid
@@ -16,8 +18,16 @@ class Notification(Document):
     type: NotificationType = Field(...)
     content: str = Field(...)
     is_read: bool = Field(default=False)
-    question_id: str = Field(default=None, index=True)
+    question_id: Optional[str] = Field(default=None, index=True)
+    # Coalesced notifications: one document for many actors of the same event
+    target_id: Optional[str] = None
+    action: Optional[str] = None
+    coalesce_key: Optional[str] = None
+    actor_ids: List[str] = Field(default_factory=list)
+    recent_actors: List[str] = Field(default_factory=list)
+    actor_count: int = 1
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: Optional[datetime] = None  # Retention deadline; None keeps it forever
     
     class Settings:
         name = "notifications"
@@ -26,6 +36,16 @@ class Notification(Document):
             "is_read",
             "created_at",
             "question_id",
+            # Listings: all of a user's notifications, or only unread ones, newest first
+            IndexModel([("user_id", 1), ("created_at", -1)]),
+            IndexModel([("user_id", 1), ("is_read", 1), ("created_at", -1)]),
+            # The TTL backstop on expires_at is managed by NotificationRetention.ensure_ttl_index
+            # At most one unread notification per coalescing window
+            IndexModel(
+                [("user_id", 1), ("coalesce_key", 1)],
+                unique=True,
+                partialFilterExpression={"is_read": False, "coalesce_key": {"$type": "string"}}
+            ),
         ]
     
     class Config:
@@ -36,3 +56,17 @@ class Notification(Document):
     def __repr__(self):
         return f"<Notification(id={self.id}, user_id={self.user_id}, type={self.type})>"
 
+
+class NotificationCounter(Document):
+    """Per-user notification counts, kept in step with every notification write"""
+    id: str = Field(..., alias="_id")  # The user ID
+    unread: int = Field(default=0)
+    total: int = Field(default=0)
+    synced: bool = Field(default=False)  # Set once counts are rebuilt from notifications
+    version: int = Field(default=0)  # Bumped on every change, for long-polling clients
+    
+    class Settings:
+        name = "notification_counters"
+    
+    def __repr__(self):
+        return f"<NotificationCounter(user_id={self.id}, unread={self.unread})>"
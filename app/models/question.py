@@ -1,6 +1,7 @@
 from beanie import Document
 from pydantic import Field
-from typing import List
+from typing import List, Optional
+from pymongo import IndexModel, DESCENDING
 from datetime import datetime
 import uuid
 
@@ -10,6 +11,8 @@ class Question(Document):
     title: str = Field(..., index=True)
     description: str = Field(...)
     tags: List[str] = Field(default_factory=list)
+    view_count: int = Field(default=0)
+    hot_score: Optional[float] = Field(default=None)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
@@ -20,6 +23,8 @@ class Question(Document):
             "title",
             "tags",
             "created_at",
+            IndexModel([("hot_score", DESCENDING)]),
+            IndexModel([("tags", 1), ("hot_score", DESCENDING)]),
         ]
     
     class Config:
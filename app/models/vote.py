@@ -15,6 +15,7 @@ class Vote(Document):
         indexes = [
             "user_id",
             "answer_id",
+            "created_at",
             ("user_id", "answer_id"),  # Compound index to ensure one vote per user per answer
         ]
     
@@ -26,3 +27,14 @@ class Vote(Document):
     def __repr__(self):
         return f"<Vote(id={self.id}, user_id={self.user_id}, answer_id={self.answer_id}, value={self.value})>"
 
+
+class FirstUpvote(Document):
+    """Marks that a user has upvoted an answer at least once, so ranking counts it only once"""
+    id: str = Field(..., alias="_id")  # "<user_id>:<answer_id>"
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    class Settings:
+        name = "first_upvotes"
+    
+    def __repr__(self):
+        return f"<FirstUpvote(id={self.id})>"
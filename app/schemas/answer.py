@@ -19,6 +19,7 @@ class AnswerResponse(AnswerBase):
     created_at: datetime
     updated_at: datetime
     vote_score: Optional[int] = 0
+    comment_count: Optional[int] = 0
     
     class Config:
         from_attributes = True
@@ -17,6 +17,7 @@ class CommentResponse(CommentBase):
     user_id: str
     answer_id: str
     parent_id: Optional[str] = None
+    depth: int = 0
     created_at: datetime
     
     class Config:
@@ -26,10 +27,23 @@ class CommentWithUser(CommentResponse):
     username: str
     user_email: str
 
+class CommentWithAnswer(CommentWithUser):
+    answer_description: str
+
 class CommentThread(CommentWithUser):
     replies: List['CommentThread'] = []
     reply_count: int = 0
 
+class CommentThreadNode(CommentWithUser):
+    reply_count: int = 0
+    replies: List['CommentThreadNode'] = []
+    replies_cursor: Optional[str] = None  # Fetches the replies after those included
+
+class CommentThreadPage(BaseModel):
+    items: List[CommentThreadNode]
+    next_cursor: Optional[str] = None
+
 # Update forward reference
 CommentThread.model_rebuild()
+CommentThreadNode.model_rebuild()
 
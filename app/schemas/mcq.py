@@ -33,11 +33,12 @@ class MCQQuizBase(BaseModel):
     topic: str = Field(..., min_length=1, max_length=100)
 
 class MCQQuizCreate(MCQQuizBase):
-    pass
+    difficulty: Optional[str] = Field(None, pattern="^(easy|medium|hard)$")
 
 class MCQQuizResponse(MCQQuizBase):
     id: str
     user_id: str
+    difficulty: Optional[str] = None
     score: int
     total_questions: int
     completed: bool
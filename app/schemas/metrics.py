@@ -56,9 +56,20 @@ class EngagementStats(BaseModel):
     total_votes: int
     total_comments: int
     active_users_today: int
+    active_users_week: int = 0
+    active_users_month: int = 0
     questions_today: int
     answers_today: int
 
+class ActivityStats(BaseModel):
+    start: datetime
+    end: datetime
+    questions: int
+    answers: int
+    comments: int
+    votes: int
+    active_users: int
+
 class TrendingTopic(BaseModel):
     tag_name: str
     question_count: int
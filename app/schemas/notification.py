@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from app.models.notification import NotificationType
 
@@ -15,6 +15,8 @@ class NotificationResponse(NotificationBase):
     id: str
     user_id: str
     is_read: bool
+    actor_count: int = 1
+    recent_actors: List[str] = []
     created_at: datetime
     
     class Config:
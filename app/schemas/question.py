@@ -21,6 +21,7 @@ class QuestionResponse(QuestionBase):
     created_at: datetime
     updated_at: datetime
     answer_count: Optional[int] = 0
+    view_count: Optional[int] = 0
     accepted_answer_id: Optional[str] = None
     
     class Config:
@@ -0,0 +1,157 @@
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+from pymongo import UpdateOne
+from app.models.activity import ActivityBucket, ActivityType, BucketGranularity
+from app.utils.hyperloglog import HyperLogLog
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+BUCKET_SIZES = {
+    BucketGranularity.MINUTE: timedelta(minutes=1),
+    BucketGranularity.HOUR: timedelta(hours=1),
+    BucketGranularity.DAY: timedelta(days=1),
+}
+
+# Fixed once buckets exist: registers of different precision cannot be merged
+ACTIVE_USERS_PRECISION = 11
+
+# Fine-grained buckets only matter for recent, partial ranges
+BUCKET_RETENTION = {
+    BucketGranularity.MINUTE: timedelta(days=2),
+    BucketGranularity.HOUR: timedelta(days=90),
+    BucketGranularity.DAY: None,
+}
+
+# Longest range one query may cover
+MAX_RANGE = timedelta(days=366)
+
+class ActivityService:
+
+    @staticmethod
+    def bucket_start(granularity: BucketGranularity, at: datetime) -> datetime:
+        """Truncate a timestamp to the start of its bucket"""
+        if granularity == BucketGranularity.MINUTE:
+            return at.replace(second=0, microsecond=0)
+        if granularity == BucketGranularity.HOUR:
+            return at.replace(minute=0, second=0, microsecond=0)
+        return at.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    @staticmethod
+    def to_naive_utc(at: datetime) -> datetime:
+        """Normalize a timestamp to the naive UTC datetimes stored in MongoDB"""
+        if at.tzinfo is None:
+            return at
+        return at.astimezone(timezone.utc).replace(tzinfo=None)
+
+    @staticmethod
+    def bucket_id(granularity: BucketGranularity, start: datetime) -> str:
+        """Get the document ID of the bucket starting at start"""
+        return f"{granularity.value}:{start.strftime('%Y-%m-%dT%H:%M')}"
+
+    @staticmethod
+    async def record(activity: ActivityType, user_id: str, at: Optional[datetime] = None):
+        """Count one write in its minute, hour and day buckets"""
+        at = at or datetime.utcnow()
+        # Registers are stored sparsely so "$max" can update them atomically
+        register, rank = HyperLogLog(ACTIVE_USERS_PRECISION).position(user_id)
+        operations = []
+
+        for granularity in BucketGranularity:
+            start = ActivityService.bucket_start(granularity, at)
+            retention = BUCKET_RETENTION[granularity]
+            operations.append(UpdateOne(
+                {"_id": ActivityService.bucket_id(granularity, start)},
+                {
+                    "$inc": {activity.value: 1},
+                    "$max": {f"active_users_hll.{register}": rank},
+                    "$setOnInsert": {
+                        "granularity": granularity.value,
+                        "start": start,
+                        "expires_at": start + retention if retention else None
+                    }
+                },
+                upsert=True
+            ))
+
+        # The post is already saved; a lost increment only undercounts the activity dashboard
+        try:
+            await ActivityBucket.get_motor_collection().bulk_write(operations, ordered=False)
+        except Exception as e:
+            logger.error(f"Activity recording error for {activity.value}: {e}")
+
+    @staticmethod
+    def covering_bucket_ids(start: datetime, end: Optional[datetime] = None) -> List[str]:
+        """Cover [start, end) with the fewest buckets, using the coarsest that fit
+
+        Without an end the range reaches the present, so buckets that are still
+        filling up can be used whole. Raises ValueError for ranges longer than
+        MAX_RANGE, or whose edges need minute or hour buckets that have expired.
+        """
+        cursor = ActivityService.bucket_start(BucketGranularity.MINUTE, start)
+        open_ended = end is None
+        now = datetime.utcnow()
+        end = end or now
+        if end - cursor > MAX_RANGE:
+            raise ValueError(f"Activity ranges cannot exceed {MAX_RANGE.days} days")
+        bucket_ids = []
+
+        while cursor < end:
+            for granularity in (BucketGranularity.DAY, BucketGranularity.HOUR, BucketGranularity.MINUTE):
+                size = BUCKET_SIZES[granularity]
+                aligned = ActivityService.bucket_start(granularity, cursor) == cursor
+                fits = open_ended or cursor + size <= end
+                if granularity == BucketGranularity.MINUTE or (aligned and fits):
+                    retention = BUCKET_RETENTION[granularity]
+                    if retention and cursor + retention <= now:
+                        unit = "hours" if granularity == BucketGranularity.MINUTE else "days"
+                        raise ValueError(
+                            f"Activity older than {retention.days} days is only kept in whole {unit}"
+                        )
+                    bucket_ids.append(ActivityService.bucket_id(granularity, cursor))
+                    cursor += size
+                    break
+
+        return bucket_ids
+
+    @staticmethod
+    async def get_activity_stats(start: datetime, end: Optional[datetime] = None) -> Dict:
+        """Get write counts and estimated distinct active users for a time range (up to now by default)"""
+        start = ActivityService.to_naive_utc(start)
+        end = ActivityService.to_naive_utc(end) if end else None
+        bucket_ids = ActivityService.covering_bucket_ids(start, end)
+
+        buckets = await ActivityBucket.get_motor_collection().find(
+            {"_id": {"$in": bucket_ids}}
+        ).to_list(length=None)
+
+        stats = {activity.value: 0 for activity in ActivityType}
+        active_users = HyperLogLog(ACTIVE_USERS_PRECISION)
+        for bucket in buckets:
+            for activity in ActivityType:
+                stats[activity.value] += bucket.get(activity.value, 0)
+            active_users.merge(HyperLogLog.from_sparse(
+                bucket.get("active_users_hll", {}), ACTIVE_USERS_PRECISION
+            ))
+
+        return {
+            "start": start,
+            "end": end or datetime.utcnow(),
+            **stats,
+            "active_users": active_users.count()
+        }
+
+    @staticmethod
+    async def get_period_stats(period: str) -> Dict:
+        """Get activity stats for today, this week (7 days) or this month (30 days)"""
+        now = datetime.utcnow()
+        today = ActivityService.bucket_start(BucketGranularity.DAY, now)
+
+        if period == "today":
+            start = today
+        elif period == "week":
+            start = today - timedelta(days=6)
+        else:
+            start = today - timedelta(days=29)
+
+        return await ActivityService.get_activity_stats(start)
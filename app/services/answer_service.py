@@ -5,7 +5,13 @@ from app.models.answer import Answer
 from app.models.question import Question
 from app.models.user import User
 from app.models.vote import Vote
+from app.models.activity import ActivityType
 from app.schemas.answer import AnswerCreate, AnswerUpdate
+from app.core.cache import cache
+from app.core.jobs import jobs
+from app.services.notification_service import NotificationService
+from app.services.activity_service import ActivityService
+from app.services.ranking_service import RankingService
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -30,6 +36,16 @@ class AnswerService:
         )
         
         await answer.insert()
+        await ActivityService.record(ActivityType.ANSWER, user_id, answer.created_at)
+        await RankingService.bump(answer.question_id, "answer", answer.created_at)
+        await cache.invalidate("questions", f"question:{answer.question_id}", "metrics")
+        
+        # Notify the question owner and mentioned users in the background
+        jobs.submit(
+            "notify_answer",
+            NotificationService.on_answer_posted,
+            answer.question_id, user_id, answer.description, answer.id
+        )
         logger.info(f"Answer created: {answer.id} for question {answer_data.question_id}")
         return answer
     
@@ -78,12 +94,10 @@ class AnswerService:
                 detail="Not authorized to update this answer"
             )
         
+        # A full save() would write back the comment_count read above and lose comments added meanwhile
         update_data = answer_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(answer, field, value)
-        
-        answer.updated_at = datetime.utcnow()
-        await answer.save()
+        await answer.update({"$set": {**update_data, "updated_at": datetime.utcnow()}})
+        await cache.invalidate(f"question:{answer.question_id}")
         
         logger.info(f"Answer updated: {answer.id}")
         return answer
@@ -109,6 +123,7 @@ class AnswerService:
         
         # Delete the answer
         await answer.delete()
+        await cache.invalidate("questions", f"question:{answer.question_id}", "metrics")
         
         logger.info(f"Answer deleted: {answer_id}")
         return True
@@ -138,8 +153,8 @@ class AnswerService:
         }).update({"$set": {"is_accepted": False}})
         
         # Accept this answer
-        answer.is_accepted = True
-        await answer.save()
+        await answer.update({"$set": {"is_accepted": True}})
+        await cache.invalidate("questions", f"question:{answer.question_id}", "metrics")
         
         logger.info(f"Answer accepted: {answer_id}")
         return answer
@@ -1,15 +1,25 @@
+import asyncio
 from typing import List, Optional, Dict
 from fastapi import HTTPException, status
 from datetime import datetime
+from pymongo import UpdateOne
 from app.models.comment import Comment
 from app.models.answer import Answer
 from app.models.user import User
+from app.models.activity import ActivityType
 from app.schemas.comment import CommentCreate, CommentUpdate
 from app.services.notification_service import NotificationService
+from app.core.cache import cache
+from app.core.jobs import jobs
+from app.services.activity_service import ActivityService
+from app.services.ranking_service import RankingService
+from app.utils.pagination import after_cursor, encode_cursor, paginate
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+ANSWER_PREVIEW_LENGTH = 100
+
 class CommentService:
     
     @staticmethod
@@ -24,6 +34,7 @@ class CommentService:
             )
         
         # If parent_id is provided, verify parent comment exists
+        ancestors = []
         if comment_data.parent_id:
             parent_comment = await Comment.get(comment_data.parent_id)
             if not parent_comment:
@@ -38,23 +49,32 @@ class CommentService:
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Parent comment must belong to the same answer"
                 )
+            
+            ancestors = parent_comment.ancestors + [parent_comment.id]
         
         comment = Comment(
             user_id=user_id,
             answer_id=comment_data.answer_id,
             parent_id=comment_data.parent_id,
+            ancestors=ancestors,
+            depth=len(ancestors),
             text=comment_data.text
         )
         
         await comment.insert()
+        await Answer.get_motor_collection().update_one(
+            {"_id": answer.id}, {"$inc": {"comment_count": 1}}
+        )
+        await ActivityService.record(ActivityType.COMMENT, user_id, comment.created_at)
+        await RankingService.bump(answer.question_id, "comment", comment.created_at)
+        await cache.invalidate("metrics")
         
-        # Send notification to answer owner
-        if answer.user_id != user_id:
-            user = await User.get(user_id)
-            if user:
-                await NotificationService.notify_comment_posted(
-                    comment_data.answer_id, user.username, answer.user_id
-                )
+        # Notify the answer owner and mentioned users in the background
+        jobs.submit(
+            "notify_comment",
+            NotificationService.on_comment_posted,
+            answer.id, answer.question_id, user_id, answer.user_id, comment.text, comment.id
+        )
         
         logger.info(f"Comment created: {comment.id} on answer {comment_data.answer_id}")
         return comment
@@ -71,39 +91,191 @@ class CommentService:
             .sort(Comment.created_at)\
             .to_list()
         
-        # Get user info for each comment
-        comments_with_users = []
+        return await CommentService._hydrate_comments(comments)
+    
+    @staticmethod
+    async def _hydrate_comments(comments: List[Comment], include_answer: bool = False) -> List[Dict]:
+        """Attach user info (and an answer preview) to comments with one query per collection
+        
+        Comments whose user or answer no longer exists are dropped.
+        """
+        user_ids = list({comment.user_id for comment in comments})
+        users = await User.get_motor_collection().find(
+            {"_id": {"$in": user_ids}},
+            {"username": 1, "email": 1}
+        ).to_list(length=None)
+        users_by_id = {user["_id"]: user for user in users}
+        
+        previews = {}
+        if include_answer:
+            answer_ids = list({comment.answer_id for comment in comments})
+            # One character past the preview length tells us whether to add "..."
+            answers = await Answer.aggregate([
+                {"$match": {"_id": {"$in": answer_ids}}},
+                {"$project": {"description": {"$substrCP": ["$description", 0, ANSWER_PREVIEW_LENGTH + 1]}}}
+            ]).to_list()
+            for answer in answers:
+                description = answer["description"]
+                if len(description) > ANSWER_PREVIEW_LENGTH:
+                    description = description[:ANSWER_PREVIEW_LENGTH] + "..."
+                previews[answer["_id"]] = description
+        
+        hydrated = []
         for comment in comments:
-            user = await User.get(comment.user_id)
-            if user:
-                comment_dict = {
-                    **comment.dict(),
-                    "username": user.username,
-                    "user_email": user.email
-                }
-                comments_with_users.append(comment_dict)
+            user = users_by_id.get(comment.user_id)
+            if not user or (include_answer and comment.answer_id not in previews):
+                continue
+            
+            comment_dict = {
+                **comment.dict(),
+                "username": user["username"],
+                "user_email": user["email"]
+            }
+            if include_answer:
+                comment_dict["answer_description"] = previews[comment.answer_id]
+            hydrated.append(comment_dict)
+        
+        return hydrated
+    
+    @staticmethod
+    async def get_comment_threads(answer_id: str, max_depth: Optional[int] = None) -> List[Dict]:
+        """Get comments organized in threads (nested structure), optionally depth-limited"""
+        query = {"answer_id": answer_id}
+        if max_depth is not None:
+            query["depth"] = {"$lte": max_depth}
+        
+        comments = await Comment.find(query).sort(Comment.created_at).to_list()
+        comments = await CommentService._hydrate_comments(comments)
+        return CommentService._build_threads(comments, lambda comment: comment["parent_id"] is None)
+    
+    @staticmethod
+    async def get_comment_subtree(comment_id: str, max_depth: Optional[int] = None) -> Optional[Dict]:
+        """Get one comment with its replies nested below it, optionally depth-limited"""
+        comment = await Comment.get(comment_id)
+        if not comment:
+            return None
+        
+        query = {"$or": [{"_id": comment_id}, {"ancestors": comment_id}]}
+        if max_depth is not None:
+            query["depth"] = {"$lte": comment.depth + max_depth}
         
-        return comments_with_users
+        comments = await Comment.find(query).sort(Comment.created_at).to_list()
+        comments = await CommentService._hydrate_comments(comments)
+        threads = CommentService._build_threads(comments, lambda comment: comment["id"] == comment_id)
+        return threads[0] if threads else None
     
     @staticmethod
-    async def get_comment_threads(answer_id: str) -> List[Dict]:
-        """Get comments organized in threads (nested structure)"""
-        comments = await CommentService.get_comments_by_answer(answer_id)
+    async def get_thread_page(
+        answer_id: str,
+        limit: int = 20,
+        reply_limit: int = 3,
+        cursor: Optional[str] = None
+    ) -> Dict:
+        """Get a page of root comments, each with its first replies and reply count"""
+        roots = await Comment.find({"answer_id": answer_id, "parent_id": None, **after_cursor(cursor)})\
+            .sort(Comment.created_at, Comment.id)\
+            .limit(limit + 1)\
+            .to_list()
+        
+        page, next_cursor = paginate(roots, limit)
+        return {
+            "items": await CommentService._with_replies(answer_id, page, reply_limit),
+            "next_cursor": next_cursor
+        }
+    
+    @staticmethod
+    async def get_reply_page(comment_id: str, limit: int = 20, cursor: Optional[str] = None) -> Optional[Dict]:
+        """Get a page of direct replies to a comment, each with its reply count"""
+        parent = await Comment.get(comment_id)
+        if not parent:
+            return None
+        
+        replies = await Comment.find({"answer_id": parent.answer_id, "parent_id": comment_id, **after_cursor(cursor)})\
+            .sort(Comment.created_at, Comment.id)\
+            .limit(limit + 1)\
+            .to_list()
+        
+        page, next_cursor = paginate(replies, limit)
+        return {
+            "items": await CommentService._with_replies(parent.answer_id, page, 0),
+            "next_cursor": next_cursor
+        }
+    
+    @staticmethod
+    async def _with_replies(answer_id: str, comments: List[Comment], reply_limit: int) -> List[Dict]:
+        """Attach reply counts and the first reply_limit replies to a page of comments"""
+        if not comments:
+            return []
+        
+        reply_counts = {
+            group["_id"]: group["reply_count"]
+            for group in await CommentService._count_replies(answer_id, [comment.id for comment in comments])
+        }
+        
+        shown_replies: Dict[str, List[Comment]] = {}
+        if reply_limit:
+            # One bounded read per parent on the (answer_id, parent_id, created_at) index, so a
+            # heavily discussed comment never materializes all of its replies
+            parent_ids = list(reply_counts)
+            pages = await asyncio.gather(*(
+                Comment.find({"answer_id": answer_id, "parent_id": parent_id})
+                .sort(Comment.created_at, Comment.id)
+                .limit(reply_limit)
+                .to_list()
+                for parent_id in parent_ids
+            ))
+            shown_replies = dict(zip(parent_ids, pages))
+        
+        replies = [reply for shown in shown_replies.values() for reply in shown]
+        
+        nested_counts = {}
+        if replies:
+            for group in await CommentService._count_replies(answer_id, [reply.id for reply in replies]):
+                nested_counts[group["_id"]] = group["reply_count"]
+        
+        hydrated = {
+            comment["id"]: comment
+            for comment in await CommentService._hydrate_comments(comments + replies)
+        }
         
-        # Separate root comments and replies
+        def node(comment: Comment, reply_count: int, shown: List[Comment]) -> Dict:
+            comment_dict = hydrated[comment.id]
+            comment_dict["reply_count"] = reply_count
+            comment_dict["replies"] = [
+                node(reply, nested_counts.get(reply.id, 0), [])
+                for reply in shown if reply.id in hydrated
+            ]
+            comment_dict["replies_cursor"] = (
+                encode_cursor(shown[-1].created_at, shown[-1].id)
+                if shown and reply_count > len(shown) else None
+            )
+            return comment_dict
+        
+        return [
+            node(comment, reply_counts.get(comment.id, 0), shown_replies.get(comment.id, []))
+            for comment in comments if comment.id in hydrated
+        ]
+    
+    @staticmethod
+    async def _count_replies(answer_id: str, parent_ids: List[str]) -> List[Dict]:
+        return await Comment.aggregate([
+            {"$match": {"answer_id": answer_id, "parent_id": {"$in": parent_ids}}},
+            {"$group": {"_id": "$parent_id", "reply_count": {"$sum": 1}}}
+        ]).to_list()
+    
+    @staticmethod
+    def _build_threads(comments: List[Dict], is_root) -> List[Dict]:
+        """Nest hydrated comments under their parents"""
         root_comments = []
         replies_map = {}
         
         for comment in comments:
-            if comment["parent_id"] is None:
-                comment["replies"] = []
-                comment["reply_count"] = 0
+            comment["replies"] = []
+            comment["reply_count"] = 0
+            if is_root(comment):
                 root_comments.append(comment)
             else:
-                parent_id = comment["parent_id"]
-                if parent_id not in replies_map:
-                    replies_map[parent_id] = []
-                replies_map[parent_id].append(comment)
+                replies_map.setdefault(comment["parent_id"], []).append(comment)
         
         # Build nested structure
         def build_thread(comment_dict):
@@ -114,10 +286,7 @@ class CommentService:
                 comment_dict["reply_count"] = len(replies)
             return comment_dict
         
-        # Build threads for root comments
-        threads = [build_thread(comment) for comment in root_comments]
-        
-        return threads
+        return [build_thread(comment) for comment in root_comments]
     
     @staticmethod
     async def update_comment(comment_id: str, comment_data: CommentUpdate, user_id: str) -> Comment:
@@ -160,26 +329,72 @@ class CommentService:
                 detail="Not authorized to delete this comment"
             )
         
-        # Delete all replies to this comment recursively
-        await CommentService._delete_comment_and_replies(comment_id)
+        # Delete the comment and all its replies in one query
+        deleted = await CommentService._delete_comment_and_replies(comment_id)
+        if deleted:
+            await Answer.get_motor_collection().update_one(
+                {"_id": comment.answer_id}, {"$inc": {"comment_count": -deleted}}
+            )
+        await cache.invalidate("metrics")
         
         logger.info(f"Comment deleted: {comment_id}")
         return True
     
     @staticmethod
-    async def _delete_comment_and_replies(comment_id: str):
-        """Recursively delete a comment and all its replies"""
-        # Find all replies to this comment
-        replies = await Comment.find(Comment.parent_id == comment_id).to_list()
+    async def _delete_comment_and_replies(comment_id: str) -> int:
+        """Delete a comment and its whole subtree; returns the number deleted"""
+        result = await Comment.find(
+            {"$or": [{"_id": comment_id}, {"ancestors": comment_id}]}
+        ).delete()
+        return result.deleted_count if result else 0
+    
+    @staticmethod
+    async def backfill_comment_paths() -> int:
+        """Fill ancestors and depth for comments created before they were stored
         
-        # Recursively delete replies
-        for reply in replies:
-            await CommentService._delete_comment_and_replies(reply.id)
+        Works one tree level per pass, so it takes as many passes as the deepest thread.
+        """
+        collection = Comment.get_motor_collection()
+        missing = {"depth": {"$exists": False}}
         
-        # Delete the comment itself
-        comment = await Comment.get(comment_id)
-        if comment:
-            await comment.delete()
+        result = await collection.update_many(
+            {**missing, "parent_id": None},
+            {"$set": {"ancestors": [], "depth": 0}}
+        )
+        migrated = result.modified_count
+        
+        while True:
+            pending = await collection.find(missing, {"parent_id": 1}).to_list(length=None)
+            if not pending:
+                break
+            
+            parents = await collection.find(
+                {"_id": {"$in": list({comment["parent_id"] for comment in pending})}, "depth": {"$exists": True}},
+                {"ancestors": 1}
+            ).to_list(length=None)
+            parents_by_id = {parent["_id"]: parent for parent in parents}
+            
+            operations = []
+            for comment in pending:
+                parent = parents_by_id.get(comment["parent_id"])
+                if parent:
+                    ancestors = parent["ancestors"] + [parent["_id"]]
+                    operations.append(UpdateOne(
+                        {"_id": comment["_id"]},
+                        {"$set": {"ancestors": ancestors, "depth": len(ancestors)}}
+                    ))
+            
+            if not operations:
+                # Only replies to deleted comments are left
+                logger.warning(f"Skipped path backfill for {len(pending)} orphaned comments")
+                break
+            
+            await collection.bulk_write(operations, ordered=False)
+            migrated += len(operations)
+        
+        if migrated:
+            logger.info(f"Backfilled comment paths for {migrated} comments")
+        return migrated
     
     @staticmethod
     async def get_user_comments(user_id: str, skip: int = 0, limit: int = 20) -> List[Dict]:
@@ -190,46 +405,73 @@ class CommentService:
             .limit(limit)\
             .to_list()
         
-        # Get user info and answer info for each comment
-        comments_with_info = []
-        for comment in comments:
-            user = await User.get(comment.user_id)
-            answer = await Answer.get(comment.answer_id)
-            
-            if user and answer:
-                comment_dict = {
-                    **comment.dict(),
-                    "username": user.username,
-                    "user_email": user.email,
-                    "answer_description": answer.description[:100] + "..." if len(answer.description) > 100 else answer.description
-                }
-                comments_with_info.append(comment_dict)
-        
-        return comments_with_info
+        return await CommentService._hydrate_comments(comments, include_answer=True)
     
     @staticmethod
     async def get_comment_count_by_answer(answer_id: str) -> int:
         """Get total comment count for an answer"""
-        return await Comment.find(Comment.answer_id == answer_id).count()
+        counts = await CommentService.get_comment_counts([answer_id])
+        return counts[answer_id]
+    
+    @staticmethod
+    async def get_comment_counts(answer_ids: List[str]) -> Dict[str, int]:
+        """Get comment counts for several answers with one lookup (0 for unknown answers)"""
+        answers = await Answer.get_motor_collection().find(
+            {"_id": {"$in": answer_ids}},
+            {"comment_count": 1}
+        ).to_list(length=None)
+        counts = {answer["_id"]: answer.get("comment_count", 0) for answer in answers}
+        return {answer_id: counts.get(answer_id, 0) for answer_id in answer_ids}
     
     @staticmethod
-    async def search_comments(query: str, skip: int = 0, limit: int = 20) -> List[Dict]:
-        """Search comments by text content"""
-        comments = await Comment.find({
-            "text": {"$regex": query, "$options": "i"}
-        }).sort(-Comment.created_at).skip(skip).limit(limit).to_list()
+    async def backfill_comment_counts() -> int:
+        """Set comment_count on answers created before it was maintained"""
+        collection = Answer.get_motor_collection()
+        answers = await collection.find(
+            {"comment_count": {"$exists": False}}, {"_id": 1}
+        ).to_list(length=None)
+        if not answers:
+            return 0
         
-        # Get user info for each comment
-        comments_with_users = []
-        for comment in comments:
-            user = await User.get(comment.user_id)
-            if user:
-                comment_dict = {
-                    **comment.dict(),
-                    "username": user.username,
-                    "user_email": user.email
-                }
-                comments_with_users.append(comment_dict)
-        
-        return comments_with_users
+        answer_ids = [answer["_id"] for answer in answers]
+        groups = await Comment.aggregate([
+            {"$match": {"answer_id": {"$in": answer_ids}}},
+            {"$group": {"_id": "$answer_id", "count": {"$sum": 1}}}
+        ]).to_list()
+        counts = {group["_id"]: group["count"] for group in groups}
+        
+        await collection.bulk_write([
+            UpdateOne({"_id": answer_id}, {"$set": {"comment_count": counts.get(answer_id, 0)}})
+            for answer_id in answer_ids
+        ], ordered=False)
+        
+        logger.info(f"Backfilled comment counts for {len(answer_ids)} answers")
+        return len(answer_ids)
+    
+    @staticmethod
+    async def search_comments(
+        query: str,
+        skip: int = 0,
+        limit: int = 20,
+        answer_id: Optional[str] = None,
+        user_id: Optional[str] = None
+    ) -> List[Dict]:
+        """Search comments by text content, most relevant first"""
+        search_filter = {"$text": {"$search": query}}
+        if answer_id:
+            search_filter["answer_id"] = answer_id
+        if user_id:
+            search_filter["user_id"] = user_id
+        
+        # Served by the text index and ranked by its relevance score
+        relevance = {"$meta": "textScore"}
+        documents = await Comment.get_motor_collection()\
+            .find(search_filter, {"score": relevance})\
+            .sort([("score", relevance), ("created_at", -1)])\
+            .skip(skip)\
+            .limit(limit)\
+            .to_list(length=None)
+        comments = [Comment.model_validate(document) for document in documents]
+        
+        return await CommentService._hydrate_comments(comments)
 
@@ -1,186 +1,111 @@
-from typing import List, Optional, Dict
+from datetime import datetime
+from typing import List, Optional, Dict, Union
 from fastapi import HTTPException, status
-import random
-from app.models.mcq import MCQQuiz, MCQQuestion
+from pymongo.errors import DuplicateKeyError
+from app.models.mcq import MCQQuiz, MCQQuestion, MCQQuizQuestion, MCQSeenQuestions
+from app.services.question_bank import BankQuestion, question_bank
 from app.schemas.mcq import MCQQuizCreate, QuizSubmission, QuizAnswer
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Concurrent quizzes on one topic race to record what was seen; the loser samples again
+SEEN_UPDATE_ATTEMPTS = 5
+
 class MCQService:
     
-    # Sample questions for different topics
-    SAMPLE_QUESTIONS = {
-        "python": [
-            {
-                "question_text": "What is the output of print(type([]))?",
-                "option_a": "<class 'list'>",
-                "option_b": "<class 'array'>",
-                "option_c": "list",
-                "option_d": "array",
-                "correct_option": "A"
-            },
-            {
-                "question_text": "Which of the following is used to define a function in Python?",
-                "option_a": "function",
-                "option_b": "def",
-                "option_c": "define",
-                "option_d": "func",
-                "correct_option": "B"
-            },
-            {
-                "question_text": "What does the len() function return?",
-                "option_a": "Length of an object",
-                "option_b": "Type of an object",
-                "option_c": "Value of an object",
-                "option_d": "Memory address",
-                "correct_option": "A"
-            },
-            {
-                "question_text": "Which operator is used for exponentiation in Python?",
-                "option_a": "^",
-                "option_b": "**",
-                "option_c": "exp",
-                "option_d": "pow",
-                "correct_option": "B"
-            },
-            {
-                "question_text": "What is the correct way to create a dictionary in Python?",
-                "option_a": "dict = []",
-                "option_b": "dict = ()",
-                "option_c": "dict = {}",
-                "option_d": "dict = <>",
-                "correct_option": "C"
-            }
-        ],
-        "javascript": [
-            {
-                "question_text": "Which method is used to add an element to the end of an array?",
-                "option_a": "push()",
-                "option_b": "add()",
-                "option_c": "append()",
-                "option_d": "insert()",
-                "correct_option": "A"
-            },
-            {
-                "question_text": "What does 'typeof null' return in JavaScript?",
-                "option_a": "null",
-                "option_b": "undefined",
-                "option_c": "object",
-                "option_d": "string",
-                "correct_option": "C"
-            },
-            {
-                "question_text": "Which keyword is used to declare a constant in JavaScript?",
-                "option_a": "var",
-                "option_b": "let",
-                "option_c": "const",
-                "option_d": "final",
-                "correct_option": "C"
-            },
-            {
-                "question_text": "What is the correct way to write a JavaScript array?",
-                "option_a": "var colors = 'red', 'green', 'blue'",
-                "option_b": "var colors = ['red', 'green', 'blue']",
-                "option_c": "var colors = (1:'red', 2:'green', 3:'blue')",
-                "option_d": "var colors = 1 = ('red'), 2 = ('green'), 3 = ('blue')",
-                "correct_option": "B"
-            },
-            {
-                "question_text": "How do you write 'Hello World' in an alert box?",
-                "option_a": "alertBox('Hello World');",
-                "option_b": "msg('Hello World');",
-                "option_c": "alert('Hello World');",
-                "option_d": "msgBox('Hello World');",
-                "correct_option": "C"
-            }
-        ],
-        "react": [
-            {
-                "question_text": "What is JSX?",
-                "option_a": "A JavaScript library",
-                "option_b": "A syntax extension for JavaScript",
-                "option_c": "A database",
-                "option_d": "A CSS framework",
-                "correct_option": "B"
-            },
-            {
-                "question_text": "Which method is used to create components in React?",
-                "option_a": "React.createComponent()",
-                "option_b": "React.createElement()",
-                "option_c": "createComponent()",
-                "option_d": "Both A and B",
-                "correct_option": "B"
-            },
-            {
-                "question_text": "What is the purpose of useState hook?",
-                "option_a": "To manage component state",
-                "option_b": "To handle side effects",
-                "option_c": "To optimize performance",
-                "option_d": "To handle routing",
-                "correct_option": "A"
-            },
-            {
-                "question_text": "Which of the following is used to pass data to a component?",
-                "option_a": "state",
-                "option_b": "props",
-                "option_c": "arguments",
-                "option_d": "parameters",
-                "correct_option": "B"
-            },
-            {
-                "question_text": "What does the useEffect hook do?",
-                "option_a": "Manages state",
-                "option_b": "Handles side effects",
-                "option_c": "Creates components",
-                "option_d": "Handles events",
-                "correct_option": "B"
-            }
-        ]
-    }
-    
     @staticmethod
     async def create_quiz(quiz_data: MCQQuizCreate, user_id: str) -> MCQQuiz:
-        """Create a new quiz for a user"""
+        """Create a new quiz for a user referencing question bank IDs"""
+        if not question_bank.available:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Quiz questions are unavailable"
+            )
+        
+        questions = await MCQService.generate_questions_for_quiz(
+            user_id, quiz_data.topic, difficulty=quiz_data.difficulty
+        )
         quiz = MCQQuiz(
             user_id=user_id,
-            topic=quiz_data.topic.lower()
+            topic=quiz_data.topic.lower(),
+            difficulty=quiz_data.difficulty,
+            question_ids=[question.id for question in questions],
+            total_questions=len(questions)
         )
         
         await quiz.insert()
         
-        # Generate questions for the quiz
-        await MCQService.generate_questions_for_quiz(quiz.id, quiz.topic)
-        
-        # Update total questions count
-        question_count = await MCQQuestion.find(MCQQuestion.quiz_id == quiz.id).count()
-        quiz.total_questions = question_count
-        await quiz.save()
-        
         logger.info(f"Quiz created: {quiz.id} for user {user_id} on topic {quiz.topic}")
         return quiz
     
     @staticmethod
-    async def generate_questions_for_quiz(quiz_id: str, topic: str, num_questions: int = 5):
-        """Generate questions for a quiz based on topic"""
-        topic_lower = topic.lower()
-        
-        if topic_lower not in MCQService.SAMPLE_QUESTIONS:
-            # If topic not found, use a mix of all available questions
-            all_questions = []
-            for questions in MCQService.SAMPLE_QUESTIONS.values():
-                all_questions.extend(questions)
-            selected_questions = random.sample(all_questions, min(num_questions, len(all_questions)))
-        else:
-            available_questions = MCQService.SAMPLE_QUESTIONS[topic_lower]
-            selected_questions = random.sample(available_questions, min(num_questions, len(available_questions)))
-        
-        for question_data in selected_questions:
-            question = MCQQuestion(
-                quiz_id=quiz_id,
-                **question_data
+    async def generate_questions_for_quiz(
+        user_id: str,
+        topic: str,
+        num_questions: int = 5,
+        difficulty: Optional[str] = None
+    ) -> List[BankQuestion]:
+        """Pick questions for a quiz based on topic, favouring a difficulty if given; unknown topics mix all topics
+        
+        Questions the user has already been given in this topic are skipped
+        until every question of the topic has been seen. The seen bits are only
+        written if nobody changed them since they were read; otherwise the
+        questions are drawn again from the newer bits.
+        """
+        # Every unknown topic draws from the whole bank, so they share one seen set
+        topic = question_bank.topic_key(topic)
+        seen_id = f"{user_id}:{topic}"
+        collection = MCQSeenQuestions.get_motor_collection()
+        
+        for _ in range(SEEN_UPDATE_ATTEMPTS):
+            seen = await MCQSeenQuestions.get(seen_id)
+            questions, bits, fingerprint = question_bank.sample_unseen(
+                topic,
+                num_questions,
+                difficulty=difficulty,
+                seen_bits=seen.bits if seen else None,
+                fingerprint=seen.fingerprint if seen else None
             )
-            await question.insert()
+            document = {
+                "user_id": user_id,
+                "topic": topic,
+                "fingerprint": fingerprint,
+                "bits": bits,
+                "updated_at": datetime.utcnow()
+            }
+            
+            if seen is None:
+                try:
+                    await collection.insert_one({"_id": seen_id, **document})
+                    return questions
+                except DuplicateKeyError:
+                    # A concurrent quiz recorded its questions first
+                    continue
+            
+            result = await collection.update_one(
+                {"_id": seen_id, "fingerprint": seen.fingerprint, "bits": seen.bits},
+                {"$set": document}
+            )
+            if result.matched_count:
+                return questions
+        
+        logger.warning(f"Seen questions for {seen_id} kept changing; quiz questions were not recorded")
+        return questions
+    
+    @staticmethod
+    async def _load_questions(quiz: MCQQuiz) -> List[Union[BankQuestion, MCQQuizQuestion]]:
+        """Questions of a quiz, from the bank or from the layouts older quizzes were stored in"""
+        if quiz.question_ids:
+            return await question_bank.get_many(quiz.question_ids)
+        if quiz.questions or not quiz.total_questions:
+            return quiz.questions
+        
+        legacy = await MCQQuestion.find(MCQQuestion.quiz_id == quiz.id).to_list()
+        return [
+            MCQQuizQuestion(**question.model_dump(exclude={"quiz_id", "revision_id"}))
+            for question in legacy
+        ]
     
     @staticmethod
     async def get_quiz_by_id(quiz_id: str) -> Optional[MCQQuiz]:
@@ -188,9 +113,9 @@ class MCQService:
         return await MCQQuiz.get(quiz_id)
     
     @staticmethod
-    async def get_quiz_questions(quiz_id: str) -> List[Dict]:
+    async def get_quiz_questions(quiz: MCQQuiz) -> List[Dict]:
         """Get questions for a quiz (without correct answers)"""
-        questions = await MCQQuestion.find(MCQQuestion.quiz_id == quiz_id).to_list()
+        questions = await MCQService._load_questions(quiz)
         
         # Return questions without correct answers
         quiz_questions = []
@@ -228,10 +153,11 @@ class MCQService:
                 detail="Quiz already completed"
             )
         
-        # Get all questions for the quiz
-        questions = await MCQQuestion.find(MCQQuestion.quiz_id == submission.quiz_id).to_list()
+        questions = await MCQService._load_questions(quiz)
         question_dict = {q.id: q for q in questions}
         
+        selected = {answer.question_id: answer.selected_option for answer in submission.answers}
+        
         # Calculate score
         correct_count = 0
         correct_answers = []
@@ -243,10 +169,20 @@ class MCQService:
             if question:
                 correct_answers.append(question.correct_option)
         
-        # Update quiz
-        quiz.score = correct_count
-        quiz.completed = True
-        await quiz.save()
+        # Only the first of concurrent submissions completes the quiz
+        completion = await MCQQuiz.get_motor_collection().update_one(
+            {"_id": quiz.id, "completed": False},
+            {"$set": {
+                "score": correct_count,
+                "completed": True,
+                "answers": "".join(selected.get(question.id, "-") for question in questions)
+            }}
+        )
+        if not completion.modified_count:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Quiz already completed"
+            )
         
         percentage = (correct_count / len(questions)) * 100 if questions else 0
         passed = percentage >= 70
@@ -277,7 +213,7 @@ class MCQService:
     @staticmethod
     async def get_available_topics() -> List[str]:
         """Get list of available quiz topics"""
-        return list(MCQService.SAMPLE_QUESTIONS.keys())
+        return question_bank.topics()
     
     @staticmethod
     async def get_topic_stats(user_id: str, topic: str) -> Dict:
@@ -5,6 +5,11 @@ from app.models.question import Question
 from app.models.answer import Answer
 from app.models.vote import Vote
 from app.models.comment import Comment
+from app.core.cache import cached
+from app.core.config import settings
+from app.core.snapshots import snapshots
+from app.services.activity_service import ActivityService
+from app.utils.singleflight import coalesce
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -12,6 +17,7 @@ logger = get_logger(__name__)
 class MetricsService:
     
     @staticmethod
+    @cached("metrics:user", tags=["metrics", "users"])
     async def get_user_metrics(user_id: str) -> Dict:
         """Get comprehensive metrics for a user"""
         user = await User.get(user_id)
@@ -84,6 +90,8 @@ class MetricsService:
         }
     
     @staticmethod
+    @coalesce("metrics.popular_users")
+    @cached("metrics:popular_users", tags=["metrics", "users"])
     async def get_popular_users(limit: int = 20) -> List[Dict]:
         """Get most popular users by reputation score"""
         users = await User.find_all().to_list()
@@ -107,6 +115,7 @@ class MetricsService:
         return user_metrics[:limit]
     
     @staticmethod
+    @cached("metrics:question", tags=["metrics", "users"])
     async def get_question_metrics(question_id: str) -> Dict:
         """Get comprehensive metrics for a question"""
         question = await Question.get(question_id)
@@ -149,7 +158,7 @@ class MetricsService:
             "title": question.title,
             "user_id": question.user_id,
             "username": user.username,
-            "view_count": 0,  # Would need to implement view tracking
+            "view_count": question.view_count,
             "answer_count": answer_count,
             "vote_score": vote_score,
             "comment_count": comment_count,
@@ -160,6 +169,8 @@ class MetricsService:
         }
     
     @staticmethod
+    @coalesce("metrics.popular_questions")
+    @cached("metrics:popular_questions", tags=["metrics", "users"])
     async def get_popular_questions(limit: int = 20, time_period: str = "all") -> List[Dict]:
         """Get most popular questions by engagement score"""
         # Define time filter
@@ -172,6 +183,14 @@ class MetricsService:
             time_filter = {"created_at": {"$gte": month_ago}}
         
         questions = await Question.find(time_filter).to_list()
+        question_metrics = await MetricsService._build_popular_questions(questions)
+        
+        # Sort by engagement score
+        question_metrics.sort(key=lambda x: x["engagement_score"], reverse=True)
+        return question_metrics[:limit]
+    
+    @staticmethod
+    async def _build_popular_questions(questions: List[Question]) -> List[Dict]:
         question_metrics = []
         
         for question in questions:
@@ -182,6 +201,7 @@ class MetricsService:
                     metrics["answer_count"] * 10 +
                     metrics["vote_score"] * 5 +
                     metrics["comment_count"] * 2 +
+                    metrics["view_count"] * 0.1 +
                     (50 if metrics["has_accepted_answer"] else 0)
                 )
                 
@@ -197,9 +217,7 @@ class MetricsService:
                     "tags": question.tags
                 })
         
-        # Sort by engagement score
-        question_metrics.sort(key=lambda x: x["engagement_score"], reverse=True)
-        return question_metrics[:limit]
+        return question_metrics
     
     @staticmethod
     async def get_top_questions(limit: int = 20) -> List[Dict]:
@@ -207,46 +225,30 @@ class MetricsService:
         return await MetricsService.get_popular_questions(limit, "all")
     
     @staticmethod
+    @coalesce("metrics.trending_questions")
+    @cached("metrics:trending_questions", tags=["metrics", "users"])
     async def get_trending_questions(limit: int = 20) -> List[Dict]:
-        """Get trending questions from the last week"""
-        return await MetricsService.get_popular_questions(limit, "week")
+        """Get trending questions by time-decayed hot score"""
+        # Served by the hot_score index, so only the top questions are read
+        questions = await Question.find_all().sort(-Question.hot_score).limit(limit).to_list()
+        return await MetricsService._build_popular_questions(questions)
     
     @staticmethod
+    @coalesce("metrics.engagement")
+    @cached("metrics:engagement", tags=["metrics"])
     async def get_engagement_stats() -> Dict:
         """Get overall platform engagement statistics"""
-        total_users = await User.find_all().count()
-        total_questions = await Question.find_all().count()
-        total_answers = await Answer.find_all().count()
-        total_votes = await Vote.find_all().count()
-        total_comments = await Comment.find_all().count()
-        
-        # Activity today
-        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        questions_today = await Question.find({
-            "created_at": {"$gte": today}
-        }).count()
-        
-        answers_today = await Answer.find({
-            "created_at": {"$gte": today}
-        }).count()
-        
-        # Active users today (users who posted questions, answers, or comments)
-        active_user_ids = set()
-        
-        today_questions = await Question.find({"created_at": {"$gte": today}}).to_list()
-        for q in today_questions:
-            active_user_ids.add(q.user_id)
-        
-        today_answers = await Answer.find({"created_at": {"$gte": today}}).to_list()
-        for a in today_answers:
-            active_user_ids.add(a.user_id)
-        
-        today_comments = await Comment.find({"created_at": {"$gte": today}}).to_list()
-        for c in today_comments:
-            active_user_ids.add(c.user_id)
-        
-        active_users_today = len(active_user_ids)
+        # Collection metadata counts instead of full collection scans
+        total_users = await User.get_motor_collection().estimated_document_count()
+        total_questions = await Question.get_motor_collection().estimated_document_count()
+        total_answers = await Answer.get_motor_collection().estimated_document_count()
+        total_votes = await Vote.get_motor_collection().estimated_document_count()
+        total_comments = await Comment.get_motor_collection().estimated_document_count()
+        
+        # Activity comes from the rolling activity buckets
+        today = await ActivityService.get_period_stats("today")
+        week = await ActivityService.get_period_stats("week")
+        month = await ActivityService.get_period_stats("month")
         
         return {
             "total_users": total_users,
@@ -254,12 +256,15 @@ class MetricsService:
             "total_answers": total_answers,
             "total_votes": total_votes,
             "total_comments": total_comments,
-            "active_users_today": active_users_today,
-            "questions_today": questions_today,
-            "answers_today": answers_today
+            "active_users_today": today["active_users"],
+            "active_users_week": week["active_users"],
+            "active_users_month": month["active_users"],
+            "questions_today": today["questions"],
+            "answers_today": today["answers"]
         }
     
     @staticmethod
+    @cached("metrics:user_activity", tags=["metrics", "users"])
     async def get_user_activity(user_id: str) -> Dict:
         """Get user activity for the current week"""
         week_ago = datetime.utcnow() - timedelta(days=7)
@@ -308,17 +313,89 @@ class MetricsService:
         }
     
     @staticmethod
+    @coalesce("metrics.active_users")
+    @cached("metrics:active_users", tags=["metrics", "users"])
     async def get_most_active_users(limit: int = 20) -> List[Dict]:
         """Get most active users this week"""
-        users = await User.find_all().to_list()
-        user_activities = []
-        
-        for user in users:
-            activity = await MetricsService.get_user_activity(user.id)
-            if activity and activity["activity_score"] > 0:
-                user_activities.append(activity)
+        week_ago = datetime.utcnow() - timedelta(days=7)
         
-        # Sort by activity score
-        user_activities.sort(key=lambda x: x["activity_score"], reverse=True)
-        return user_activities[:limit]
+        # One pipeline over every activity source, so only active users are touched
+        def recent_activity(kind: str) -> List[Dict]:
+            return [
+                {"$match": {"created_at": {"$gte": week_ago}}},
+                {"$project": {"_id": 0, "user_id": 1, "kind": {"$literal": kind}}}
+            ]
+        
+        def count_of(kind: str) -> Dict:
+            return {"$sum": {"$cond": [{"$eq": ["$kind", kind]}, 1, 0]}}
+        
+        pipeline = [
+            *recent_activity("question"),
+            {"$unionWith": {"coll": Answer.get_collection_name(), "pipeline": recent_activity("answer")}},
+            {"$unionWith": {"coll": Comment.get_collection_name(), "pipeline": recent_activity("comment")}},
+            {"$unionWith": {"coll": Vote.get_collection_name(), "pipeline": recent_activity("vote")}},
+            {"$group": {
+                "_id": "$user_id",
+                "questions_this_week": count_of("question"),
+                "answers_this_week": count_of("answer"),
+                "comments_this_week": count_of("comment"),
+                "votes_this_week": count_of("vote")
+            }},
+            {"$addFields": {"activity_score": {"$add": [
+                {"$multiply": ["$questions_this_week", 5]},
+                {"$multiply": ["$answers_this_week", 3]},
+                "$comments_this_week",
+                {"$multiply": ["$votes_this_week", 0.5]}
+            ]}}},
+            {"$sort": {"activity_score": -1, "_id": 1}},
+            {"$limit": limit},
+            {"$lookup": {
+                "from": User.get_collection_name(),
+                "localField": "_id",
+                "foreignField": "_id",
+                "as": "user"
+            }},
+            {"$unwind": "$user"},
+            {"$project": {
+                "_id": 0,
+                "user_id": "$_id",
+                "username": "$user.username",
+                "questions_this_week": 1,
+                "answers_this_week": 1,
+                "votes_this_week": 1,
+                "comments_this_week": 1,
+                "activity_score": 1
+            }}
+        ]
+        
+        return await Question.aggregate(pipeline).to_list()
+
+# Snapshots are computed at the largest page size the API allows and sliced per request
+SNAPSHOT_SIZE = 100
 
+snapshots.register(
+    "metrics.engagement",
+    MetricsService.get_engagement_stats,
+    settings.snapshot_engagement_interval_seconds
+)
+for period in ("all", "week", "month"):
+    snapshots.register(
+        f"metrics.popular_questions.{period}",
+        lambda period=period: MetricsService.get_popular_questions(SNAPSHOT_SIZE, period),
+        settings.snapshot_questions_interval_seconds
+    )
+snapshots.register(
+    "metrics.trending_questions",
+    lambda: MetricsService.get_trending_questions(SNAPSHOT_SIZE),
+    settings.snapshot_questions_interval_seconds
+)
+snapshots.register(
+    "metrics.popular_users",
+    lambda: MetricsService.get_popular_users(SNAPSHOT_SIZE),
+    settings.snapshot_users_interval_seconds
+)
+snapshots.register(
+    "metrics.active_users",
+    lambda: MetricsService.get_most_active_users(SNAPSHOT_SIZE),
+    settings.snapshot_users_interval_seconds
+)
@@ -1,14 +1,24 @@
-from typing import List, Optional
+import re
+import uuid
+from typing import Dict, Iterable, List, Optional, Tuple
 from datetime import datetime, timedelta
 from fastapi import HTTPException, status
-from app.models.notification import Notification, NotificationType
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from app.models.notification import Notification, NotificationCounter, NotificationType
 from app.models.user import User
 from app.models.question import Question
-from app.schemas.notification import NotificationCreate
+from app.schemas.notification import NotificationCreate, NotificationResponse
+from app.core.config import settings
+from app.core.notification_hub import notification_hub
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+MENTION_PATTERN = re.compile(r"(?<![\w@])@(\w+)")
+
+DUPLICATE_KEY_ERROR = 11000
+
 class NotificationService:
     
     @staticmethod
@@ -18,13 +28,169 @@ class NotificationService:
             user_id=notification_data.user_id,
             type=notification_data.type,
             content=notification_data.content,
-            question_id=notification_data.question_id
+            question_id=notification_data.question_id,
+            expires_at=NotificationService.expires_at(is_read=False)
         )
         
         await notification.insert()
+        await notification_hub.publish_to(notification.user_id, NotificationService._event(notification))
+        await NotificationService._adjust_counter(notification.user_id, unread=1, total=1)
         logger.info(f"Notification created: {notification.id} for user {notification_data.user_id}")
         return notification
     
+    @staticmethod
+    async def fan_out(
+        type: NotificationType,
+        content: str,
+        recipient_ids: Iterable[str],
+        actor_id: Optional[str] = None,
+        question_id: Optional[str] = None,
+        event_id: Optional[str] = None
+    ) -> int:
+        """Notify many users of one event with chunked, unordered bulk inserts
+        
+        Recipients are de-duplicated and the actor is skipped. With an event_id
+        the notification IDs are derived from it, so re-running the same event
+        (e.g. a retried job) does not notify anyone twice. Returns the number of
+        notifications written.
+        """
+        recipients = [
+            recipient_id for recipient_id in dict.fromkeys(recipient_ids)
+            if recipient_id and recipient_id != actor_id
+        ]
+        if not recipients:
+            return 0
+        
+        created_at = datetime.utcnow()
+        documents = [
+            {
+                "_id": f"{event_id}:{recipient_id}" if event_id else str(uuid.uuid4()),
+                "user_id": recipient_id,
+                "type": type.value,
+                "content": content,
+                "is_read": False,
+                "question_id": question_id,
+                "created_at": created_at,
+                "expires_at": NotificationService.expires_at(is_read=False, at=created_at)
+            }
+            for recipient_id in recipients
+        ]
+        
+        collection = Notification.get_motor_collection()
+        chunk_size = settings.notification_fanout_chunk_size
+        inserted = 0
+        for start in range(0, len(documents), chunk_size):
+            chunk = documents[start:start + chunk_size]
+            failed = set()
+            try:
+                await collection.insert_many(chunk, ordered=False)
+            except BulkWriteError as e:
+                # Already-delivered notifications of a re-run event are expected
+                errors = e.details.get("writeErrors", [])
+                if any(error.get("code") != DUPLICATE_KEY_ERROR for error in errors):
+                    raise
+                failed = {error["index"] for error in errors}
+            
+            delivered = [document for index, document in enumerate(chunk) if index not in failed]
+            if delivered:
+                await notification_hub.publish({
+                    document["user_id"]: NotificationService._event(Notification.model_construct(
+                        id=document["_id"],
+                        **{key: value for key, value in document.items() if key != "_id"}
+                    ))
+                    for document in delivered
+                })
+                await NotificationService.adjust_counters({document["user_id"]: (1, 1) for document in delivered})
+            inserted += len(delivered)
+        
+        logger.info(f"Fan-out of {type.value} notification to {inserted} users")
+        return inserted
+    
+    @staticmethod
+    async def coalesce_notification(
+        user_id: str,
+        type: NotificationType,
+        target_id: str,
+        actor_id: str,
+        actor_username: str,
+        action: str,
+        question_id: Optional[str] = None
+    ):
+        """Fold an event into the user's unread notification for the same target
+        
+        Events with the same (user, type, target, action) inside one coalescing
+        window share a document counting distinct actors, e.g. "alice and 4
+        others commented on your answer". Falls back to one document per event
+        when coalescing is disabled.
+        """
+        if not settings.notification_coalesce_enabled:
+            await NotificationService.create_notification(NotificationCreate(
+                user_id=user_id,
+                type=type,
+                content=f"{actor_username} {action}",
+                question_id=question_id
+            ))
+            return
+        
+        now = datetime.utcnow()
+        window = int(now.timestamp() // settings.notification_coalesce_window_seconds)
+        unread = {
+            "user_id": user_id,
+            "coalesce_key": f"{type.value}:{target_id}:{action}:{window}",
+            "is_read": False
+        }
+        update = {
+            "$setOnInsert": {"_id": str(uuid.uuid4()), "type": type.value, "target_id": target_id, "action": action},
+            "$addToSet": {"actor_ids": actor_id},
+            "$push": {"recent_actors": {
+                "$each": [actor_username], "$position": 0, "$slice": settings.notification_recent_actors
+            }},
+            "$inc": {"actor_count": 1},
+            # Coalesced notifications resurface with their latest event
+            "$set": {
+                "content": f"{actor_username} {action}",
+                "question_id": question_id,
+                "created_at": now,
+                "expires_at": NotificationService.expires_at(is_read=False, at=now)
+            }
+        }
+        # Only actors not already counted match; the unique index stops a second unread document
+        new_actor = {**unread, "actor_ids": {"$ne": actor_id}}
+        collection = Notification.get_motor_collection()
+        
+        try:
+            document = await collection.find_one_and_update(
+                new_actor, update, upsert=True, return_document=ReturnDocument.AFTER
+            )
+            inserted = document["actor_count"] == 1
+        except DuplicateKeyError:
+            # Either a concurrent insert won the race, or this actor is already counted
+            inserted = False
+            document = await collection.find_one_and_update(
+                new_actor, update, return_document=ReturnDocument.AFTER
+            )
+            if document is None:
+                document = await collection.find_one_and_update(
+                    unread, {"$set": {"created_at": now}}, return_document=ReturnDocument.AFTER
+                )
+        
+        if document is not None:
+            notification = NotificationService.summarize(Notification.model_validate(document))
+            await notification_hub.publish_to(user_id, NotificationService._event(notification))
+        if inserted:
+            await NotificationService._adjust_counter(user_id, unread=1, total=1)
+    
+    @staticmethod
+    def summarize(notification: Notification) -> Notification:
+        """Render the content of a coalesced notification from its actors"""
+        if notification.actor_count > 1 and notification.recent_actors and notification.action:
+            others = notification.actor_count - 1
+            notification.content = (
+                f"{notification.recent_actors[0]} and {others} other{'s' if others > 1 else ''} "
+                f"{notification.action}"
+            )
+        return notification
+    
     @staticmethod
     async def get_user_notifications(
         user_id: str,
@@ -43,7 +209,7 @@ class NotificationService:
             .limit(limit)\
             .to_list()
         
-        return notifications
+        return [NotificationService.summarize(notification) for notification in notifications]
     
     @staticmethod
     async def mark_notification_as_read(notification_id: str, user_id: str) -> Notification:
@@ -61,11 +227,18 @@ class NotificationService:
                 detail="Not authorized to update this notification"
             )
         
+        # Only the request that flips is_read adjusts the counter
+        expires_at = NotificationService.expires_at(is_read=True)
+        result = await Notification.get_motor_collection().update_one(
+            {"_id": notification_id, "is_read": False}, {"$set": {"is_read": True, "expires_at": expires_at}}
+        )
+        if result.modified_count:
+            await NotificationService._adjust_counter(user_id, unread=-1)
+            notification.expires_at = expires_at
         notification.is_read = True
-        await notification.save()
         
         logger.info(f"Notification marked as read: {notification_id}")
-        return notification
+        return NotificationService.summarize(notification)
     
     @staticmethod
     async def mark_all_as_read(user_id: str) -> int:
@@ -73,31 +246,177 @@ class NotificationService:
         result = await Notification.find({
             "user_id": user_id,
             "is_read": False
-        }).update({"$set": {"is_read": True}})
+        }).update({"$set": {"is_read": True, "expires_at": NotificationService.expires_at(is_read=True)}})
+        if result.modified_count:
+            await NotificationService._adjust_counter(user_id, unread=-result.modified_count)
         
         logger.info(f"All notifications marked as read for user: {user_id}")
         return result.modified_count
     
     @staticmethod
     async def get_notification_stats(user_id: str) -> dict:
-        """Get notification statistics for a user"""
-        total_count = await Notification.find({"user_id": user_id}).count()
-        unread_count = await Notification.find({
-            "user_id": user_id,
-            "is_read": False
-        }).count()
-        
+        """Get notification statistics for a user with one aggregation"""
         # Recent notifications (last 24 hours)
         twenty_four_hours_ago = datetime.utcnow() - timedelta(hours=24)
-        recent_count = await Notification.find({
-            "user_id": user_id,
-            "created_at": {"$gte": twenty_four_hours_ago}
-        }).count()
+        results = await Notification.aggregate([
+            {"$match": {"user_id": user_id}},
+            {"$facet": {
+                "total": [{"$count": "count"}],
+                "unread": [{"$match": {"is_read": False}}, {"$count": "count"}],
+                "recent": [{"$match": {"created_at": {"$gte": twenty_four_hours_ago}}}, {"$count": "count"}]
+            }}
+        ]).to_list()
+        
+        facets = results[0] if results else {}
+        
+        def count(name: str) -> int:
+            return facets[name][0]["count"] if facets.get(name) else 0
+        
+        return {
+            "total_count": count("total"),
+            "unread_count": count("unread"),
+            "recent_count": count("recent")
+        }
+    
+    @staticmethod
+    async def get_unread_count(user_id: str) -> int:
+        """Get a user's unread count from their counter document"""
+        counter = await NotificationService.get_counter(user_id)
+        return max(counter.unread, 0)
+    
+    @staticmethod
+    async def get_counter(user_id: str) -> NotificationCounter:
+        """Get a user's counter document, rebuilding it if it is missing or not yet exact"""
+        counter = await NotificationCounter.get(user_id)
+        if counter is None or not counter.synced:
+            counter = await NotificationService.rebuild_counter(user_id)
+        return counter
+    
+    @staticmethod
+    async def wait_for_unread_count(user_id: str, since: Optional[int], timeout: float) -> dict:
+        """Long-poll a user's unread count until its version moves past since
+        
+        Returns at once when since is missing or already stale, otherwise when
+        the count next changes or the timeout expires.
+        """
+        # Watched before reading so a change in between is not missed
+        waiter = notification_hub.watch(user_id)
+        try:
+            counter = await NotificationService.get_counter(user_id)
+            state = {"unread_count": max(counter.unread, 0), "version": counter.version}
+            if since is None or counter.version != since or timeout <= 0:
+                return state
+            
+            event = await notification_hub.wait(waiter, timeout)
+            if event is None or event.get("version") is None:
+                return state
+            return {"unread_count": event["unread_count"], "version": event["version"]}
+        finally:
+            notification_hub.unwatch(user_id, waiter)
+    
+    @staticmethod
+    async def rebuild_counter(user_id: str) -> NotificationCounter:
+        """Recount a user's notifications into their counter document"""
+        stats = await NotificationService.get_notification_stats(user_id)
+        document = await NotificationCounter.get_motor_collection().find_one_and_update(
+            {"_id": user_id},
+            {
+                "$set": {"unread": stats["unread_count"], "total": stats["total_count"], "synced": True},
+                "$inc": {"version": 1}
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return NotificationCounter.model_validate(document)
+    
+    @staticmethod
+    def expires_at(is_read: bool, at: Optional[datetime] = None) -> Optional[datetime]:
+        """Retention deadline for a notification that became unread or read at a time"""
+        days = settings.notification_read_retention_days if is_read else settings.notification_unread_retention_days
+        if days <= 0:
+            return None
+        return (at or datetime.utcnow()) + timedelta(days=days)
+    
+    @staticmethod
+    async def backfill_expiry() -> int:
+        """Set retention deadlines on notifications created before they were stored"""
+        migrated = 0
+        for is_read, days in (
+            (True, settings.notification_read_retention_days),
+            (False, settings.notification_unread_retention_days)
+        ):
+            if days <= 0:
+                continue
+            # Counted from creation, as the time a notification was read is unknown
+            result = await Notification.get_motor_collection().update_many(
+                {"expires_at": {"$exists": False}, "is_read": is_read},
+                [{"$set": {"expires_at": {"$add": ["$created_at", days * 24 * 3600 * 1000]}}}]
+            )
+            migrated += result.modified_count
+        
+        if migrated:
+            logger.info(f"Backfilled retention deadlines for {migrated} notifications")
+        return migrated
+    
+    @staticmethod
+    async def adjust_counters(deltas: Dict[str, Tuple[int, int]]):
+        """Apply (unread, total) deltas to many users' counters with one bulk write"""
+        try:
+            await NotificationCounter.get_motor_collection().bulk_write([
+                UpdateOne(
+                    {"_id": user_id},
+                    {"$inc": {"unread": unread, "total": total, "version": 1}},
+                    upsert=True
+                )
+                for user_id, (unread, total) in deltas.items()
+            ], ordered=False)
+        except Exception as e:
+            logger.error(f"Notification counter update error for {len(deltas)} users: {e}")
+            return
+        
+        # Re-read only the counters someone is listening to
+        listeners = notification_hub.listeners(list(deltas))
+        if listeners:
+            counters = NotificationCounter.get_motor_collection().find(
+                {"_id": {"$in": listeners}, "synced": True}
+            )
+            await notification_hub.publish({
+                counter["_id"]: {
+                    "type": "unread_count",
+                    "unread_count": max(counter["unread"], 0),
+                    "version": counter["version"]
+                }
+                async for counter in counters
+            })
+    
+    @staticmethod
+    async def _adjust_counter(user_id: str, unread: int = 0, total: int = 0):
+        # The notification itself is already stored; rebuild_counter corrects a count that drifts
+        try:
+            counter = await NotificationCounter.get_motor_collection().find_one_and_update(
+                {"_id": user_id},
+                {"$inc": {"unread": unread, "total": total, "version": 1}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except Exception as e:
+            logger.error(f"Notification counter update error for user {user_id}: {e}")
+            return
         
+        # Counts are only pushed once they are known to be exact
+        if counter.get("synced"):
+            await notification_hub.publish_to(user_id, {
+                "type": "unread_count",
+                "unread_count": max(counter["unread"], 0),
+                "version": counter["version"]
+            })
+    
+    @staticmethod
+    def _event(notification: Notification) -> dict:
+        """Stream event for a new or updated notification"""
         return {
-            "total_count": total_count,
-            "unread_count": unread_count,
-            "recent_count": recent_count
+            "type": "notification",
+            "notification": NotificationResponse.model_validate(notification).model_dump(mode="json")
         }
     
     @staticmethod
@@ -116,58 +435,189 @@ class NotificationService:
                 detail="Not authorized to delete this notification"
             )
         
-        await notification.delete()
+        # The deleted document itself says whether it was still unread
+        deleted = await Notification.get_motor_collection().find_one_and_delete({"_id": notification_id})
+        if deleted:
+            await NotificationService._adjust_counter(
+                user_id, unread=0 if deleted.get("is_read") else -1, total=-1
+            )
         logger.info(f"Notification deleted: {notification_id}")
         return True
     
     # Helper methods for creating specific types of notifications
     
     @staticmethod
-    async def notify_answer_posted(question_id: str, answerer_username: str):
-        """Notify question owner when someone answers their question"""
+    async def notify_answer_posted(
+        question_id: str,
+        answerer_username: str,
+        answerer_id: Optional[str] = None,
+        answer_id: Optional[str] = None
+    ):
+        """Notify question owner when someone answers their question
+        
+        With an answer_id the notification ID is derived from it, so a retried
+        job does not notify the owner twice.
+        """
         question = await Question.get(question_id)
-        if not question:
+        if not question or question.user_id == answerer_id:
             return
         
         content = f"{answerer_username} answered your question: {question.title}"
         
-        await NotificationService.create_notification(NotificationCreate(
-            user_id=question.user_id,
-            type=NotificationType.ANSWER,
-            content=content,
-            question_id=question_id
-        ))
+        await NotificationService.fan_out(
+            NotificationType.ANSWER,
+            content,
+            [question.user_id],
+            actor_id=answerer_id,
+            question_id=question_id,
+            event_id=f"answer:{answer_id}" if answer_id else None
+        )
     
     @staticmethod
-    async def notify_comment_posted(answer_id: str, commenter_username: str, answer_owner_id: str):
+    async def notify_comment_posted(
+        answer_id: str,
+        commenter_username: str,
+        answer_owner_id: str,
+        question_id: Optional[str] = None,
+        commenter_id: Optional[str] = None
+    ):
         """Notify answer owner when someone comments on their answer"""
-        content = f"{commenter_username} commented on your answer"
-        
-        await NotificationService.create_notification(NotificationCreate(
-            user_id=answer_owner_id,
-            type=NotificationType.COMMENT,
-            content=content
-        ))
+        await NotificationService.coalesce_notification(
+            answer_owner_id,
+            NotificationType.COMMENT,
+            answer_id,
+            commenter_id or commenter_username,
+            commenter_username,
+            "commented on your answer",
+            question_id
+        )
     
     @staticmethod
-    async def notify_mention(mentioned_user_id: str, mentioner_username: str, context: str):
-        """Notify user when they are mentioned"""
+    async def notify_mention(
+        mentioned_user_id: str,
+        mentioner_username: str,
+        context: str,
+        question_id: Optional[str] = None,
+        event_id: Optional[str] = None
+    ):
+        """Notify user when they are mentioned
+        
+        Pass the event_id of the mentioning post (e.g. "mention:<answer_id>") so
+        a retried job does not notify the user twice.
+        """
         content = f"{mentioner_username} mentioned you in {context}"
         
-        await NotificationService.create_notification(NotificationCreate(
-            user_id=mentioned_user_id,
-            type=NotificationType.MENTION,
-            content=content
-        ))
+        await NotificationService.fan_out(
+            NotificationType.MENTION,
+            content,
+            [mentioned_user_id],
+            question_id=question_id,
+            event_id=event_id
+        )
     
     @staticmethod
-    async def notify_vote_received(answer_owner_id: str, voter_username: str, vote_type: str):
+    async def notify_vote_received(
+        answer_owner_id: str,
+        voter_username: str,
+        vote_type: str,
+        question_id: Optional[str] = None,
+        answer_id: Optional[str] = None,
+        voter_id: Optional[str] = None
+    ):
         """Notify answer owner when their answer receives a vote"""
-        content = f"{voter_username} {vote_type}d your answer"
+        await NotificationService.coalesce_notification(
+            answer_owner_id,
+            NotificationType.VOTE,
+            answer_id or question_id or answer_owner_id,
+            voter_id or voter_username,
+            voter_username,
+            f"{vote_type}d your answer",
+            question_id
+        )
+    
+    @staticmethod
+    async def notify_mentions(
+        text: str,
+        mentioner_id: str,
+        mentioner_username: str,
+        context: str,
+        question_id: Optional[str] = None,
+        exclude: Iterable[str] = (),
+        event_id: Optional[str] = None
+    ) -> int:
+        """Notify every existing user @mentioned in text, except the author"""
+        usernames = set(MENTION_PATTERN.findall(text))
+        if not usernames:
+            return 0
         
-        await NotificationService.create_notification(NotificationCreate(
-            user_id=answer_owner_id,
-            type=NotificationType.VOTE,
-            content=content
-        ))
-
+        users = await User.get_motor_collection().find(
+            {"username": {"$in": list(usernames)}}, {"_id": 1}
+        ).to_list(length=None)
+        
+        skipped = set(exclude)
+        return await NotificationService.fan_out(
+            NotificationType.MENTION,
+            f"{mentioner_username} mentioned you in {context}",
+            [user["_id"] for user in users if user["_id"] not in skipped],
+            actor_id=mentioner_id,
+            question_id=question_id,
+            event_id=event_id
+        )
+    
+    # Event handlers, run on the background job queue rather than the request path
+    
+    @staticmethod
+    async def on_answer_posted(question_id: str, answerer_id: str, text: str, answer_id: Optional[str] = None):
+        """Notify the question owner and anyone mentioned in a new answer"""
+        answerer = await User.get(answerer_id)
+        if not answerer:
+            return
+        
+        await NotificationService.notify_answer_posted(question_id, answerer.username, answerer_id, answer_id)
+        await NotificationService.notify_mentions(
+            text, answerer_id, answerer.username, "an answer", question_id,
+            event_id=f"mention:{answer_id}" if answer_id else None
+        )
+    
+    @staticmethod
+    async def on_comment_posted(
+        answer_id: str,
+        question_id: str,
+        commenter_id: str,
+        answer_owner_id: str,
+        text: str,
+        comment_id: Optional[str] = None
+    ):
+        """Notify the answer owner and anyone mentioned in a new comment"""
+        commenter = await User.get(commenter_id)
+        if not commenter:
+            return
+        
+        if answer_owner_id != commenter_id:
+            await NotificationService.notify_comment_posted(
+                answer_id, commenter.username, answer_owner_id, question_id, commenter_id
+            )
+        # The answer owner already hears about the comment itself
+        await NotificationService.notify_mentions(
+            text, commenter_id, commenter.username, "a comment", question_id,
+            exclude=[answer_owner_id],
+            event_id=f"mention:{comment_id}" if comment_id else None
+        )
+    
+    @staticmethod
+    async def on_vote_cast(
+        answer_owner_id: str,
+        voter_id: str,
+        value: int,
+        question_id: Optional[str] = None,
+        answer_id: Optional[str] = None
+    ):
+        """Notify the answer owner about a new or changed vote"""
+        voter = await User.get(voter_id)
+        if not voter:
+            return
+        
+        vote_type = "upvote" if value > 0 else "downvote"
+        await NotificationService.notify_vote_received(
+            answer_owner_id, voter.username, vote_type, question_id, answer_id, voter_id
+        )
@@ -0,0 +1,398 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+from datetime import datetime
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+import yaml
+from pymongo.errors import BulkWriteError
+from app.core.config import settings
+from app.models.mcq import MCQBankQuestion
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CONTENT_FIELDS = ("question_text", "option_a", "option_b", "option_c", "option_d", "correct_option")
+
+DIFFICULTY_LEVELS = {"easy": 1, "medium": 2, "hard": 3}
+DEFAULT_DIFFICULTY = 2
+
+# Relative weight of a question by its distance from the requested difficulty
+DIFFICULTY_AFFINITY = (4, 2, 1)
+
+DUPLICATE_KEY_ERROR = 11000
+
+# Key of the whole bank, which unknown topics draw from
+ALL_TOPICS = "_all"
+
+def question_id(question: dict) -> str:
+    """Content hash of a question, used as its bank ID"""
+    content = json.dumps([question[field].strip() for field in CONTENT_FIELDS], ensure_ascii=False)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:24]
+
+class BankQuestion(NamedTuple):
+    """A bank question held in memory; far lighter than a document for large banks"""
+    id: str
+    question_text: str
+    option_a: str
+    option_b: str
+    option_c: str
+    option_d: str
+    correct_option: str
+    difficulty: int
+
+class TopicIndex(NamedTuple):
+    """A topic's question IDs in one array, ordered by difficulty
+
+    Questions of difficulty d occupy ids[bounds[d - 1]:bounds[d]]. The
+    fingerprint changes whenever the array does.
+    """
+    ids: List[str]
+    bounds: Tuple[int, ...]
+    fingerprint: str
+
+def _is_set(bits: bytearray, position: int) -> bool:
+    return bool(bits[position >> 3] & (1 << (position & 7)))
+
+def _set(bits: bytearray, position: int):
+    bits[position >> 3] |= 1 << (position & 7)
+
+def _count_bits(bits: bytearray, start: int, end: int) -> int:
+    """Number of set bits in positions [start, end)"""
+    if start >= end:
+        return 0
+    value = int.from_bytes(bits[start >> 3:(end + 7) >> 3], "little") >> (start & 7)
+    return (value & ((1 << (end - start)) - 1)).bit_count()
+
+def _unset_positions(bits: bytearray, start: int, end: int) -> List[int]:
+    """Positions in [start, end) whose bit is clear, skipping full bytes whole"""
+    positions = []
+    position = start
+    while position < end:
+        if not position & 7 and position + 8 <= end and bits[position >> 3] == 0xFF:
+            position += 8
+            continue
+        if not _is_set(bits, position):
+            positions.append(position)
+        position += 1
+    return positions
+
+def _difficulty(value) -> int:
+    if value is None:
+        return DEFAULT_DIFFICULTY
+    if isinstance(value, str):
+        return DIFFICULTY_LEVELS[value.lower()]
+    if value in DIFFICULTY_LEVELS.values():
+        return int(value)
+    raise ValueError(f"unknown difficulty {value!r}")
+
+def _records(path: str) -> Iterator[Tuple[List[str], object]]:
+    """Yield (topics, record) pairs from a YAML, JSON or NDJSON bank file
+
+    Records are yielded as found; parse_bank validates them one at a time.
+    """
+    with open(path, "r", encoding="utf-8") as bank_file:
+        if path.endswith((".ndjson", ".jsonl")):
+            data = [json.loads(line) for line in bank_file if line.strip()]
+        elif path.endswith(".json"):
+            data = json.load(bank_file)
+        else:
+            data = yaml.load(bank_file, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+
+    if isinstance(data, dict):
+        for topic, questions in data.items():
+            for question in questions if isinstance(questions, list) else [questions]:
+                yield [topic], question
+    elif isinstance(data, list):
+        for question in data:
+            topics = (question.get("topics") or [question.get("topic")]) if isinstance(question, dict) else []
+            yield topics, question
+    elif data is not None:
+        raise ValueError("bank file must hold a list of questions or a mapping of topics to questions")
+
+def parse_bank(path: str) -> Tuple[Dict[str, BankQuestion], Dict[str, List[str]], int]:
+    """Read a bank file into questions by ID and question IDs by topic
+
+    Duplicate questions are stored once; invalid records are skipped and counted.
+    """
+    questions: Dict[str, BankQuestion] = {}
+    topics: Dict[str, Dict[str, None]] = {}
+    skipped = 0
+    for names, record in _records(path):
+        try:
+            if not isinstance(record, dict):
+                raise ValueError("record is not a mapping")
+            content = {field: record[field].strip() for field in CONTENT_FIELDS}
+            if content["correct_option"] not in ("A", "B", "C", "D"):
+                raise ValueError("invalid correct_option")
+            if not isinstance(names, list) or not names or not all(isinstance(name, str) and name for name in names):
+                raise ValueError("invalid topic")
+            question = BankQuestion(
+                id=question_id(content), difficulty=_difficulty(record.get("difficulty")), **content
+            )
+        except (AttributeError, KeyError, TypeError, ValueError):
+            skipped += 1
+            continue
+
+        questions[question.id] = question
+        for name in names:
+            # A dict keeps insertion order and drops duplicates within a topic
+            topics.setdefault(name.lower(), {})[question.id] = None
+    return questions, {topic: list(ids) for topic, ids in topics.items()}, skipped
+
+class QuestionBank:
+    """In-process question bank loaded from a data file, indexed by ID and by topic
+
+    Each topic is one array of IDs grouped by difficulty, so sampling never
+    copies or rebuilds lists. Every question is also written to the mcq_bank
+    collection the first time it is seen, because quizzes keep referencing
+    questions by ID after they are edited out of the file.
+    """
+
+    def __init__(self, path: str, reload_interval: float = 30, store_batch_size: int = 1000):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.store_batch_size = store_batch_size
+        self._questions: Dict[str, BankQuestion] = {}
+        self._topics: Dict[str, TopicIndex] = {}
+        self._all = TopicIndex([], (0,) * (len(DIFFICULTY_LEVELS) + 1), "")
+        self._mtime: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.loaded_at: Optional[datetime] = None
+        self.loads = 0
+        self.skipped = 0
+        self.failures = 0
+
+    def _index(self, ids: List[str], questions: Dict[str, BankQuestion]) -> TopicIndex:
+        ordered = sorted(ids, key=lambda key: questions[key].difficulty)
+        bounds = [0]
+        position = 0
+        for level in range(1, len(DIFFICULTY_LEVELS) + 1):
+            while position < len(ordered) and questions[ordered[position]].difficulty == level:
+                position += 1
+            bounds.append(position)
+        fingerprint = hashlib.sha256("\n".join(ordered).encode("ascii")).hexdigest()[:16]
+        return TopicIndex(ordered, tuple(bounds), fingerprint)
+
+    def _build(self) -> Tuple[Dict[str, BankQuestion], Dict[str, TopicIndex], TopicIndex, int]:
+        questions, topics, skipped = parse_bank(self.path)
+        return (
+            questions,
+            {topic: self._index(ids, questions) for topic, ids in topics.items()},
+            self._index(list(questions), questions),
+            skipped
+        )
+
+    async def _store_new(self, questions: Sequence[BankQuestion]):
+        collection = MCQBankQuestion.get_motor_collection()
+        for start in range(0, len(questions), self.store_batch_size):
+            chunk = questions[start:start + self.store_batch_size]
+            existing = {
+                document["_id"] async for document in
+                collection.find({"_id": {"$in": [question.id for question in chunk]}}, {"_id": 1})
+            }
+            documents = [
+                {"_id": question.id, **question._asdict()} for question in chunk if question.id not in existing
+            ]
+            for document in documents:
+                del document["id"]
+            if not documents:
+                continue
+            try:
+                await collection.insert_many(documents, ordered=False)
+            except BulkWriteError as e:
+                # Another worker stored the same questions first
+                if any(error.get("code") != DUPLICATE_KEY_ERROR for error in e.details.get("writeErrors", [])):
+                    raise
+
+    async def reload(self, force: bool = False) -> bool:
+        """Load the bank file if it changed since the last load; returns True if it was loaded"""
+        async with self._lock:
+            mtime = os.path.getmtime(self.path)
+            if not force and mtime == self._mtime:
+                return False
+
+            # Parsing a large bank is CPU-bound, so it runs off the event loop
+            questions, topics, all_questions, skipped = await asyncio.to_thread(self._build)
+            await self._store_new([
+                question for key, question in questions.items() if key not in self._questions
+            ])
+
+            # Swapped in whole so readers never see a half-built index
+            self._questions, self._topics, self._all = questions, topics, all_questions
+            self._mtime = mtime
+            self.loaded_at = datetime.utcnow()
+            self.loads += 1
+            self.skipped = skipped
+            logger.info(
+                f"Question bank loaded from {self.path}: {len(questions)} questions "
+                f"in {len(topics)} topics, {skipped} invalid records skipped"
+            )
+            return True
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                await self.reload()
+            except Exception as e:
+                # Keep serving the last good bank
+                self.failures += 1
+                logger.error(f"Question bank reload failed: {e}")
+
+    async def start(self):
+        """Load the bank and start watching the file for changes
+
+        A missing or unreadable file does not stop the app: quizzes stay
+        unavailable until a reload succeeds.
+        """
+        try:
+            await self.reload(force=True)
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Question bank load from {self.path} failed, quizzes disabled: {e}")
+        if self._task is None and self.reload_interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    @property
+    def available(self) -> bool:
+        return bool(self._questions)
+
+    def topics(self) -> List[str]:
+        return list(self._topics)
+
+    def topic_key(self, topic: str) -> str:
+        """Normalize a requested topic: a known topic's name, or ALL_TOPICS"""
+        topic = topic.lower()
+        return topic if topic in self._topics else ALL_TOPICS
+
+    def _index_for(self, topic: str) -> TopicIndex:
+        return self._topics.get(topic.lower()) or self._all
+
+    def _draw(self, index: TopicIndex, k: int, difficulty: Optional[str], seen: Optional[bytearray]) -> List[int]:
+        """Draw up to k distinct positions of index, skipping positions set in seen"""
+        target = DIFFICULTY_LEVELS[difficulty] if difficulty else None
+        weights = [
+            DIFFICULTY_AFFINITY[abs(level - target)] if target else 1
+            for level in range(1, len(DIFFICULTY_LEVELS) + 1)
+        ]
+        pools: List[Sequence[int]] = []
+        available = []
+        for level in range(len(weights)):
+            start, end = index.bounds[level], index.bounds[level + 1]
+            unseen = end - start - (_count_bits(seen, start, end) if seen else 0)
+            # A mostly-seen level is listed out, so draws never spin on rejections
+            if seen and unseen * 8 < end - start:
+                pools.append(_unset_positions(seen, start, end))
+            else:
+                pools.append(range(start, end))
+            available.append(unseen)
+
+        remaining = [len(pool) for pool in pools]
+        # Lazy Fisher-Yates per level: slots already drawn are swapped out via these maps
+        swapped: List[Dict[int, int]] = [{} for _ in pools]
+        picked = []
+
+        for _ in range(min(k, sum(available))):
+            masses = [weight * count for weight, count in zip(weights, available)]
+            point = random.random() * sum(masses)
+            level = max(level for level, mass in enumerate(masses) if mass)
+            for candidate, mass in enumerate(masses):
+                if mass and point < mass:
+                    level = candidate
+                    break
+                point -= mass
+
+            pool, swaps = pools[level], swapped[level]
+            while True:
+                last = remaining[level] - 1
+                slot = random.randint(0, last)
+                position = swaps.get(slot, pool[slot])
+                swaps[slot] = swaps.get(last, pool[last])
+                remaining[level] -= 1
+                if not (seen and _is_set(seen, position)):
+                    break
+            picked.append(position)
+            available[level] -= 1
+
+        return picked
+
+    def sample(self, topic: str, k: int, difficulty: Optional[str] = None) -> List[BankQuestion]:
+        """Pick k distinct questions of a topic, or of the whole bank for unknown topics
+
+        With a difficulty, each question is weighted by how close its level is;
+        without one every question is equally likely. Runs in O(k) whatever the
+        size of the topic.
+        """
+        index = self._index_for(topic)
+        return [self._questions[index.ids[position]] for position in self._draw(index, k, difficulty, None)]
+
+    def sample_unseen(
+        self,
+        topic: str,
+        k: int,
+        difficulty: Optional[str] = None,
+        seen_bits: Optional[bytes] = None,
+        fingerprint: Optional[str] = None
+    ) -> Tuple[List[BankQuestion], bytes, str]:
+        """Like sample, but skip questions whose bit is set in seen_bits
+
+        Bit i stands for position i of the topic's index, so the bits only apply
+        while the topic's fingerprint is unchanged. Once too few unseen questions
+        are left the bits are cleared and the topic starts over. Returns the
+        questions and the updated bits and fingerprint to store.
+        """
+        index = self._index_for(topic)
+        size = (len(index.ids) + 7) // 8
+        if seen_bits is not None and fingerprint == index.fingerprint and len(seen_bits) == size:
+            seen = bytearray(seen_bits)
+        else:
+            seen = bytearray(size)
+
+        picked = self._draw(index, k, difficulty, seen)
+        if len(picked) < k:
+            # Exhausted: start a new round that still avoids what was just picked
+            seen = bytearray(size)
+            for position in picked:
+                _set(seen, position)
+            picked += self._draw(index, k - len(picked), difficulty, seen)
+
+        for position in picked:
+            _set(seen, position)
+        return [self._questions[index.ids[position]] for position in picked], bytes(seen), index.fingerprint
+
+    async def get_many(self, ids: List[str]) -> List[BankQuestion]:
+        """Get questions by ID in order, reading any no longer in the bank file from the database"""
+        found = {key: self._questions[key] for key in ids if key in self._questions}
+        missing = [key for key in ids if key not in found]
+        if missing:
+            for document in await MCQBankQuestion.find({"_id": {"$in": missing}}).to_list():
+                found[document.id] = BankQuestion(
+                    id=document.id,
+                    difficulty=document.difficulty,
+                    **{field: getattr(document, field) for field in CONTENT_FIELDS}
+                )
+        return [found[key] for key in ids if key in found]
+
+    def stats(self) -> dict:
+        return {
+            "questions": len(self._questions),
+            "topics": len(self._topics),
+            "loads": self.loads,
+            "skipped_records": self.skipped,
+            "failures": self.failures,
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None
+        }
+
+question_bank = QuestionBank(
+    settings.mcq_question_bank_path,
+    reload_interval=settings.mcq_question_bank_reload_seconds
+)
@@ -4,7 +4,11 @@ from datetime import datetime
 from app.models.question import Question
 from app.models.answer import Answer
 from app.models.user import User
+from app.models.activity import ActivityType
 from app.schemas.question import QuestionCreate, QuestionUpdate
+from app.core.cache import cache
+from app.services.activity_service import ActivityService
+from app.services.ranking_service import RankingService
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -20,8 +24,11 @@ class QuestionService:
             description=question_data.description,
             tags=question_data.tags
         )
+        question.hot_score = RankingService.initial_score(question.created_at)
         
         await question.insert()
+        await ActivityService.record(ActivityType.QUESTION, user_id, question.created_at)
+        await cache.invalidate("questions", "tags", "metrics")
         logger.info(f"Question created: {question.id} by user {user_id}")
         return question
     
@@ -35,13 +42,14 @@ class QuestionService:
         skip: int = 0,
         limit: int = 20,
         tags: Optional[List[str]] = None,
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        sort: str = "newest"
     ) -> List[Question]:
-        """Get questions with optional filtering"""
+        """Get questions with optional filtering, newest or hottest first"""
         query = Question.find_all()
         
         if tags:
-            query = query.find(Question.tags.in_(tags))
+            query = query.find({"tags": {"$in": tags}})
         
         if search:
             # Simple text search in title and description
@@ -52,7 +60,8 @@ class QuestionService:
                 ]
             })
         
-        questions = await query.sort(-Question.created_at).skip(skip).limit(limit).to_list()
+        order = -Question.hot_score if sort == "hot" else -Question.created_at
+        questions = await query.sort(order).skip(skip).limit(limit).to_list()
         return questions
     
     @staticmethod
@@ -81,12 +90,10 @@ class QuestionService:
                 detail="Not authorized to update this question"
             )
         
+        # $set rather than save(): a full write would roll back views and hot score bumps made since the read
         update_data = question_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(question, field, value)
-        
-        question.updated_at = datetime.utcnow()
-        await question.save()
+        await question.update({"$set": {**update_data, "updated_at": datetime.utcnow()}})
+        await cache.invalidate("questions", f"question:{question.id}", "tags", "metrics")
         
         logger.info(f"Question updated: {question.id}")
         return question
@@ -112,6 +119,7 @@ class QuestionService:
         
         # Delete the question
         await question.delete()
+        await cache.invalidate("questions", f"question:{question_id}", "tags", "metrics")
         
         logger.info(f"Question deleted: {question_id}")
         return True
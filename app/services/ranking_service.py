@@ -0,0 +1,92 @@
+import math
+from typing import Dict, List, Optional
+from datetime import datetime
+from app.core.config import settings
+from app.models.question import Question
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Scores are stored relative to a fixed epoch so they never need rescaling
+HOT_EPOCH = datetime(2024, 1, 1)
+
+# Engagement weights; asking the question itself is worth 1
+HOT_WEIGHTS = {
+    "question": 1.0,
+    "answer": 4.0,
+    "upvote": 2.0,
+    "comment": 1.0,
+    "view": 0.1,
+}
+
+def _decay_hours() -> float:
+    return settings.hot_half_life_hours / math.log(2)
+
+class RankingService:
+    """Time-decayed "hot" scores for questions
+
+    hot_score is log(sum(weight * exp((t - HOT_EPOCH) / tau))) over every
+    engagement event, so an event loses half its weight every half-life. Kept in
+    the log domain, adding an event is an atomic log-sum-exp update and the
+    score sorts directly from an index.
+    """
+
+    @staticmethod
+    def event_score(weight: float, at: Optional[datetime] = None) -> float:
+        """Get the log-domain score of one event"""
+        at = at or datetime.utcnow()
+        hours = (at - HOT_EPOCH).total_seconds() / 3600
+        return math.log(weight) + hours / _decay_hours()
+
+    @staticmethod
+    def initial_score(created_at: datetime) -> float:
+        return RankingService.event_score(HOT_WEIGHTS["question"], created_at)
+
+    @staticmethod
+    def _initial_score_expression() -> Dict:
+        # Subtracting two dates gives milliseconds
+        decay_ms = _decay_hours() * 3600 * 1000
+        return {"$divide": [{"$subtract": ["$created_at", HOT_EPOCH]}, decay_ms]}
+
+    @staticmethod
+    def hot_score_expression(weight: float, at: Optional[datetime] = None) -> Dict:
+        """Update expression adding an event to hot_score (log-sum-exp)"""
+        event = RankingService.event_score(weight, at)
+        return {"$let": {
+            "vars": {"current": {"$ifNull": ["$hot_score", RankingService._initial_score_expression()]}},
+            "in": {"$add": [
+                {"$max": ["$$current", event]},
+                {"$ln": {"$add": [1, {"$exp": {"$subtract": [
+                    {"$min": ["$$current", event]},
+                    {"$max": ["$$current", event]}
+                ]}}]}}
+            ]}
+        }}
+
+    @staticmethod
+    def bump_update(weight: float, at: Optional[datetime] = None, fields: Optional[Dict] = None) -> List[Dict]:
+        """Build a pipeline update bumping hot_score, optionally setting other fields"""
+        return [{"$set": {**(fields or {}), "hot_score": RankingService.hot_score_expression(weight, at)}}]
+
+    @staticmethod
+    async def bump(question_id: str, event: str, at: Optional[datetime] = None):
+        """Add one engagement event to a question's hot score"""
+        # A missed bump only leaves the question a little low in the hot feed until its next event
+        try:
+            await Question.get_motor_collection().update_one(
+                {"_id": question_id},
+                RankingService.bump_update(HOT_WEIGHTS[event], at)
+            )
+        except Exception as e:
+            logger.error(f"Hot score update error for question {question_id}: {e}")
+
+    @staticmethod
+    async def backfill_hot_scores() -> int:
+        """Give questions without a hot score their initial score"""
+        result = await Question.get_motor_collection().update_many(
+            {"hot_score": None},
+            [{"$set": {"hot_score": RankingService._initial_score_expression()}}]
+        )
+        if result.modified_count:
+            logger.info(f"Backfilled hot scores for {result.modified_count} questions")
+        return result.modified_count
@@ -0,0 +1,165 @@
+import asyncio
+import gzip
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from pymongo.errors import BulkWriteError
+from app.core.config import settings
+from app.models.notification import Notification
+from app.services.notification_service import NotificationService
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class NotificationRetention:
+    """Delete expired notifications in batches, optionally archiving them first
+
+    Notifications carry an expires_at deadline (see NotificationService.expires_at).
+    The sweep removes them on time and keeps the per-user counters exact; the TTL
+    index on expires_at only catches what the sweep misses, a grace period later.
+    With archiving on, exactly the deleted notifications are archived.
+    """
+
+    def __init__(
+        self,
+        interval: float = 300,
+        batch_size: int = 1000,
+        archive: bool = False,
+        archive_dir: str = "archive/notifications"
+    ):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.archive = archive
+        self.archive_dir = archive_dir
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.sweeps = 0
+        self.deleted = 0
+        self.archived = 0
+        self.failures = 0
+
+    def _archive_path(self, now: datetime) -> str:
+        return os.path.join(self.archive_dir, f"notifications-{now:%Y%m%d}.ndjson.gz")
+
+    def _write_archive(self, path: str, documents: List[dict]):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Appending adds a gzip member; readers decompress concatenated members as one stream
+        with gzip.open(path, "ab") as archive:
+            archive.write("".join(
+                json.dumps(document, default=str) + "\n" for document in documents
+            ).encode("utf-8"))
+
+    async def _delete_batch(self, now: datetime) -> Tuple[int, int]:
+        """Delete one batch of expired notifications; returns (found, deleted)"""
+        collection = Notification.get_motor_collection()
+        candidates = await collection.find(
+            {"expires_at": {"$lte": now}}, {"_id": 1}
+        ).limit(self.batch_size).to_list(length=self.batch_size)
+        if not candidates:
+            return 0, 0
+
+        # One atomic delete per notification returns exactly what was removed: ones
+        # read or coalesced since the find have a new deadline and no longer match
+        deleted = await asyncio.gather(*[
+            collection.find_one_and_delete({"_id": candidate["_id"], "expires_at": {"$lte": now}})
+            for candidate in candidates
+        ])
+        documents = [document for document in deleted if document is not None]
+        if not documents:
+            return len(candidates), 0
+
+        if self.archive:
+            try:
+                await asyncio.to_thread(self._write_archive, self._archive_path(now), documents)
+            except Exception:
+                # Nothing is lost if the archive cannot be written
+                await self._restore(documents)
+                raise
+            self.archived += len(documents)
+
+        deltas: Dict[str, Tuple[int, int]] = {}
+        for document in documents:
+            unread, total = deltas.get(document["user_id"], (0, 0))
+            deltas[document["user_id"]] = (unread - (not document.get("is_read")), total - 1)
+        await NotificationService.adjust_counters(deltas)
+        return len(candidates), len(documents)
+
+    async def _restore(self, documents: List[dict]):
+        try:
+            await Notification.get_motor_collection().insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            logger.error(f"Notification retention could not restore {len(e.details.get('writeErrors', []))} notifications")
+
+    async def sweep(self) -> int:
+        """Remove all notifications past their deadline; returns the number deleted"""
+        async with self._lock:
+            now = datetime.utcnow()
+            deleted = 0
+            try:
+                while True:
+                    found, count = await self._delete_batch(now)
+                    deleted += count
+                    if found < self.batch_size:
+                        break
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Notification retention sweep error after {deleted} deletions: {e}")
+
+            self.sweeps += 1
+            self.deleted += deleted
+            if deleted:
+                logger.info(f"Notification retention removed {deleted} expired notifications")
+            return deleted
+
+    async def ensure_ttl_index(self):
+        """Create the TTL backstop on expires_at, or update its grace period in place
+
+        Declaring it on the model would make index creation fail at startup
+        whenever notification_ttl_grace_seconds changes.
+        """
+        collection = Notification.get_motor_collection()
+        grace = settings.notification_ttl_grace_seconds
+        for index in (await collection.index_information()).values():
+            if index["key"] == [("expires_at", 1)]:
+                if index.get("expireAfterSeconds") != grace:
+                    await collection.database.command(
+                        "collMod", collection.name,
+                        index={"keyPattern": {"expires_at": 1}, "expireAfterSeconds": grace}
+                    )
+                    logger.info(f"Notification TTL grace period changed to {grace}s")
+                return
+        await collection.create_index([("expires_at", 1)], expireAfterSeconds=grace)
+
+    async def _run(self):
+        while True:
+            await self.sweep()
+            await asyncio.sleep(self.interval)
+
+    async def start(self):
+        """Sync the TTL backstop index and start the periodic sweep loop"""
+        await self.ensure_ttl_index()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info("Notification retention started")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "sweeps": self.sweeps,
+            "deleted": self.deleted,
+            "archived": self.archived,
+            "failures": self.failures
+        }
+
+notification_retention = NotificationRetention(
+    interval=settings.notification_retention_sweep_interval_seconds,
+    batch_size=settings.notification_retention_batch_size,
+    archive=settings.notification_archive_enabled,
+    archive_dir=settings.notification_archive_dir
+)
@@ -4,6 +4,8 @@ from fastapi import HTTPException, status
 from app.models.tag import Tag
 from app.models.question import Question
 from app.schemas.tag import TagCreate
+from app.core.cache import cache, cached
+from app.utils.singleflight import coalesce
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -20,6 +22,7 @@ class TagService:
         
         tag = Tag(name=tag_data.name.lower())
         await tag.insert()
+        await cache.invalidate("tags")
         logger.info(f"Tag created: {tag.name}")
         return tag
     
@@ -40,6 +43,8 @@ class TagService:
         return tags
     
     @staticmethod
+    @coalesce("tags.popular")
+    @cached("tags:popular", tags=["tags"])
     async def get_popular_tags(limit: int = 20) -> List[dict]:
         """Get popular tags with question counts"""
         tags = await Tag.find_all().to_list()
@@ -47,7 +52,7 @@ class TagService:
         
         for tag in tags:
             # Count questions with this tag
-            question_count = await Question.find(Question.tags.in_([tag.name])).count()
+            question_count = await Question.find({"tags": {"$in": [tag.name]}}).count()
             
             # Count recent questions (last 30 days)
             thirty_days_ago = datetime.utcnow() - timedelta(days=30)
@@ -86,6 +91,7 @@ class TagService:
         return tags
     
     @staticmethod
+    @coalesce("tags.stats")
     async def get_tag_stats(tag_name: str) -> dict:
         """Get detailed statistics for a tag"""
         tag = await TagService.get_tag_by_name(tag_name)
@@ -96,7 +102,7 @@ class TagService:
             )
         
         # Count total questions
-        total_questions = await Question.find(Question.tags.in_([tag.name])).count()
+        total_questions = await Question.find({"tags": {"$in": [tag.name]}}).count()
         
         # Count recent questions (last 30 days)
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
@@ -106,7 +112,7 @@ class TagService:
         }).count()
         
         # Get latest questions
-        latest_questions = await Question.find(Question.tags.in_([tag.name]))\
+        latest_questions = await Question.find({"tags": {"$in": [tag.name]}})\
             .sort(-Question.created_at)\
             .limit(5)\
             .to_list()
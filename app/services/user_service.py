@@ -1,8 +1,9 @@
 from typing import Optional
 from fastapi import HTTPException, status
 from app.models.user import User, UserRole
-from app.schemas.user import UserCreate, UserUpdate
+from app.schemas.user import UserCreate, UserUpdate, UserResponse
 from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.cache import cache
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -38,6 +39,7 @@ class UserService:
         )
         
         await user.insert()
+        await cache.invalidate("metrics")
         logger.info(f"User created: {user.username}")
         return user
     
@@ -76,6 +78,21 @@ class UserService:
         """Get user by ID"""
         return await User.get(user_id)
     
+    @staticmethod
+    async def get_user_profile(user_id: str) -> Optional[UserResponse]:
+        """Get a user's public profile (cached)"""
+        cached_profile = await cache.get(f"user:{user_id}")
+        if cached_profile is not None:
+            return UserResponse.model_validate(cached_profile)
+        
+        user = await User.get(user_id)
+        if not user:
+            return None
+        
+        profile = UserResponse.model_validate(user)
+        await cache.set(f"user:{user_id}", profile.model_dump(), tags=[f"user:{user_id}", "users"])
+        return profile
+    
     @staticmethod
     async def get_user_by_username(username: str) -> Optional[User]:
         """Get user by username"""
@@ -115,6 +132,7 @@ class UserService:
             setattr(user, field, value)
         
         await user.save()
+        await cache.invalidate("users", f"user:{user_id}")
         logger.info(f"User updated: {user.username}")
         return user
 
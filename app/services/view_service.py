@@ -0,0 +1,128 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+from pymongo import UpdateOne
+from app.core.config import settings
+from app.models.question import Question
+from app.services.ranking_service import HOT_WEIGHTS, RankingService
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class ViewCounter:
+    """Aggregate question views in memory and flush them with one bulk write
+
+    A viewer (user or IP) is counted at most once per question within the
+    dedupe window. Counts that fail to flush are kept for the next attempt.
+    """
+
+    def __init__(self, flush_interval: float = 10, dedupe_window: float = 1800, max_viewers: int = 100000):
+        self.flush_interval = flush_interval
+        self.dedupe_window = dedupe_window
+        self.max_viewers = max_viewers
+        self._pending: Dict[str, int] = {}
+        self._seen: "OrderedDict[Tuple[str, Hashable], float]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.views = 0
+        self.deduplicated = 0
+        self.flushes = 0
+        self.flushed_views = 0
+        self.failures = 0
+
+    def record(self, question_id: str, viewer: Optional[str] = None) -> bool:
+        """Count a view; returns False if the viewer was already counted recently"""
+        if viewer is not None and self.dedupe_window > 0:
+            now = time.monotonic()
+            self._expire(now)
+            key = (question_id, viewer)
+            if key in self._seen:
+                self.deduplicated += 1
+                return False
+            self._seen[key] = now + self.dedupe_window
+            if len(self._seen) > self.max_viewers:
+                self._seen.popitem(last=False)
+
+        self._pending[question_id] = self._pending.get(question_id, 0) + 1
+        self.views += 1
+        return True
+
+    def _expire(self, now: float):
+        # Entries share one window, so the oldest always expire first
+        while self._seen:
+            key, expires_at = next(iter(self._seen.items()))
+            if expires_at > now:
+                break
+            del self._seen[key]
+
+    def pending(self, question_id: str) -> int:
+        """Get views recorded for a question but not flushed yet"""
+        return self._pending.get(question_id, 0)
+
+    async def flush(self) -> int:
+        """Write the buffered counts; returns the number of views flushed"""
+        async with self._lock:
+            if not self._pending:
+                return 0
+
+            pending, self._pending = self._pending, {}
+            # One pipeline update per question increments the count and bumps the hot score
+            operations = [
+                UpdateOne({"_id": question_id}, RankingService.bump_update(
+                    HOT_WEIGHTS["view"] * count,
+                    fields={"view_count": {"$add": [{"$ifNull": ["$view_count", 0]}, count]}}
+                ))
+                for question_id, count in pending.items()
+            ]
+
+            try:
+                await Question.get_motor_collection().bulk_write(operations, ordered=False)
+            except Exception as e:
+                self.failures += 1
+                for question_id, count in pending.items():
+                    self._pending[question_id] = self._pending.get(question_id, 0) + count
+                logger.error(f"View count flush error, keeping {sum(pending.values())} views: {e}")
+                return 0
+
+            flushed = sum(pending.values())
+            self.flushes += 1
+            self.flushed_views += flushed
+            return flushed
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def start(self):
+        """Start the periodic flush loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info("View counter started")
+
+    async def stop(self):
+        """Stop the flush loop and write out any remaining views"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "views": self.views,
+            "deduplicated": self.deduplicated,
+            "pending_views": sum(self._pending.values()),
+            "pending_questions": len(self._pending),
+            "tracked_viewers": len(self._seen),
+            "flushes": self.flushes,
+            "flushed_views": self.flushed_views,
+            "failures": self.failures
+        }
+
+view_counter = ViewCounter(
+    flush_interval=settings.view_flush_interval_seconds,
+    dedupe_window=settings.view_dedupe_window_seconds,
+    max_viewers=settings.view_dedupe_max_entries
+)
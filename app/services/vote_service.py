@@ -1,8 +1,16 @@
 from typing import Optional
+from datetime import datetime
 from fastapi import HTTPException, status
-from app.models.vote import Vote
+from pymongo.errors import DuplicateKeyError
+from app.models.vote import Vote, FirstUpvote
 from app.models.answer import Answer
+from app.models.activity import ActivityType
 from app.schemas.vote import VoteCreate
+from app.core.cache import cache
+from app.core.jobs import jobs
+from app.services.notification_service import NotificationService
+from app.services.activity_service import ActivityService
+from app.services.ranking_service import RankingService
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -38,12 +46,22 @@ class VoteService:
             if existing_vote.value == vote_data.value:
                 # Same vote, remove it (toggle off)
                 await existing_vote.delete()
+                await VoteService._invalidate(answer)
                 logger.info(f"Vote removed: {existing_vote.id}")
                 return None
             else:
                 # Different vote, update it
                 existing_vote.value = vote_data.value
                 await existing_vote.save()
+                await ActivityService.record(ActivityType.VOTE, user_id)
+                if vote_data.value > 0:
+                    await VoteService._bump_first_upvote(user_id, answer)
+                await VoteService._invalidate(answer)
+                jobs.submit(
+                    "notify_vote",
+                    NotificationService.on_vote_cast,
+                    answer.user_id, user_id, vote_data.value, answer.question_id, answer.id
+                )
                 logger.info(f"Vote updated: {existing_vote.id}")
                 return existing_vote
         else:
@@ -54,9 +72,36 @@ class VoteService:
                 value=vote_data.value
             )
             await vote.insert()
+            await ActivityService.record(ActivityType.VOTE, user_id, vote.created_at)
+            if vote.value > 0:
+                await VoteService._bump_first_upvote(user_id, answer, vote.created_at)
+            await VoteService._invalidate(answer)
+            jobs.submit(
+                "notify_vote",
+                NotificationService.on_vote_cast,
+                answer.user_id, user_id, vote.value, answer.question_id, answer.id
+            )
             logger.info(f"Vote created: {vote.id}")
             return vote
     
+    @staticmethod
+    async def _invalidate(answer: Answer):
+        """Drop cached responses showing the answer's score or the question's hot rank"""
+        await cache.invalidate("questions", f"question:{answer.question_id}", "metrics")
+    
+    @staticmethod
+    async def _bump_first_upvote(user_id: str, answer: Answer, at: Optional[datetime] = None):
+        """Bump the question's hot score for a user's first upvote of an answer only
+        
+        Votes are deleted when toggled off, so the marker lives in its own
+        collection and re-upvoting or flipping a vote back never bumps again.
+        """
+        try:
+            await FirstUpvote(id=f"{user_id}:{answer.id}", created_at=at or datetime.utcnow()).insert()
+        except DuplicateKeyError:
+            return
+        await RankingService.bump(answer.question_id, "upvote", at)
+    
     @staticmethod
     async def get_vote_stats(answer_id: str, user_id: Optional[str] = None) -> dict:
         """Get vote statistics for an answer"""
@@ -106,6 +151,11 @@ class VoteService:
             )
         
         await vote.delete()
+        answer = await Answer.get(answer_id)
+        if answer:
+            await VoteService._invalidate(answer)
+        else:
+            await cache.invalidate("metrics")
         logger.info(f"Vote removed: {vote.id}")
         return True
 
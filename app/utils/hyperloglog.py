@@ -0,0 +1,89 @@
+# hyperloglog.py
+
+import hashlib
+import math
+from typing import Dict, Iterable, Tuple
+
+class HyperLogLog:
+    """Mergeable distinct-count estimator in constant memory
+
+    With precision p there are 2**p one-byte registers and the standard error is
+    about 1.04 / sqrt(2**p) (2.3% for the default p=11, in 2 KiB).
+    """
+
+    HASH_BITS = 64
+
+    def __init__(self, precision: int = 11, registers: bytearray = None):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = registers if registers is not None else bytearray(self.size)
+        if len(self.registers) != self.size:
+            raise ValueError(f"expected {self.size} registers, got {len(self.registers)}")
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    def position(self, value: str) -> Tuple[int, int]:
+        """Get the register index and rank a value maps to"""
+        hashed = self._hash(value)
+        remaining_bits = self.HASH_BITS - self.precision
+        index = hashed >> remaining_bits
+        remainder = hashed & ((1 << remaining_bits) - 1)
+        rank = remaining_bits - remainder.bit_length() + 1
+        return index, rank
+
+    def add(self, value: str) -> bool:
+        """Add a value; returns True if a register changed"""
+        index, rank = self.position(value)
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def update(self, values: Iterable[str]):
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Fold another estimator into this one (the union of both sets)"""
+        if other.precision != self.precision:
+            raise ValueError("cannot merge HyperLogLogs with different precision")
+
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self) -> int:
+        """Estimate the number of distinct values added"""
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        estimate = alpha * self.size ** 2 / sum(2.0 ** -register for register in self.registers)
+
+        # Linear counting is more accurate while many registers are still empty
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.size and zeros:
+            estimate = self.size * math.log(self.size / zeros)
+
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        """Serialize as one precision byte followed by the registers"""
+        return bytes([self.precision]) + bytes(self.registers)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        return cls(precision=data[0], registers=bytearray(data[1:]))
+
+    def to_sparse(self) -> Dict[str, int]:
+        """Serialize the non-empty registers as {"index": rank}"""
+        return {str(index): rank for index, rank in enumerate(self.registers) if rank}
+
+    @classmethod
+    def from_sparse(cls, registers: Dict[str, int], precision: int = 11) -> "HyperLogLog":
+        hll = cls(precision=precision)
+        for index, rank in registers.items():
+            hll.registers[int(index)] = max(hll.registers[int(index)], rank)
+        return hll
@@ -0,0 +1,43 @@
+# pagination.py
+
+import base64
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import HTTPException, status
+
+def encode_cursor(created_at: datetime, item_id: str) -> str:
+    """Encode a keyset position (created_at, id) as an opaque cursor"""
+    raw = f"{created_at.isoformat()}|{item_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, item_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), item_id
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def after_cursor(cursor: Optional[str], descending: bool = False) -> Dict[str, Any]:
+    """Query filter for items after a cursor in (created_at, _id) order"""
+    if not cursor:
+        return {}
+
+    created_at, item_id = decode_cursor(cursor)
+    op = "$lt" if descending else "$gt"
+    return {"$or": [
+        {"created_at": {op: created_at}},
+        {"created_at": created_at, "_id": {op: item_id}}
+    ]}
+
+def paginate(items: List[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Split limit + 1 fetched items into a page and the cursor for the next one"""
+    page = items[:limit]
+    if len(items) <= limit or not page:
+        return page, None
+
+    last = page[-1]
+    return page, encode_cursor(last.created_at, last.id)
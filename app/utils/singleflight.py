@@ -0,0 +1,69 @@
+# singleflight.py
+
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one in-flight computation"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn for key, or await the result of the call already running for it"""
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.executions += 1
+            # Run as its own task so a cancelled caller does not cancel the waiters
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._forget, key))
+
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every caller went away
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight)
+        }
+
+_groups: Dict[str, SingleFlight] = {}
+
+def get_group(name: str) -> SingleFlight:
+    """Get or create the named singleflight group"""
+    if name not in _groups:
+        _groups[name] = SingleFlight(name)
+    return _groups[name]
+
+def coalesce(name: str):
+    """Coalesce concurrent calls of an async function with equal arguments"""
+    group = get_group(name)
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            return await group.do(key, lambda: func(*args, **kwargs))
+        return wrapper
+    return decorator
+
+def singleflight_stats() -> Dict[str, dict]:
+    """Get call and coalescing counts for every group"""
+    return {name: group.stats() for name, group in _groups.items()}
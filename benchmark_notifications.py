@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Notification fan-out benchmark for StackIt Backend
+
+Writes one notification to each of N synthetic recipients through
+NotificationService.fan_out, compares it with one insert per recipient, and
+removes everything it wrote. It never uses the app's configured MongoDB: the
+server must be given explicitly, and the app's own URL is refused. Results are
+written to a separate database (stackit_benchmark by default).
+
+Usage: python benchmark_notifications.py --mongodb-url mongodb://localhost:27017 [recipients]
+       (or set BENCHMARK_MONGODB_URL)
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+from app.core.config import Settings, settings
+from app.db.database import connect_to_mongo, close_mongo_connection
+from app.models.notification import Notification, NotificationCounter, NotificationType
+from app.schemas.notification import NotificationCreate
+from app.services.notification_service import NotificationService
+
+async def benchmark(recipient_count: int):
+    await connect_to_mongo()
+    run_id = f"benchmark-{uuid.uuid4()}"
+    recipients = [f"{run_id}:user-{i}" for i in range(recipient_count)]
+
+    try:
+        print(f"Fan-out to {recipient_count} recipients...")
+
+        started = time.perf_counter()
+        written = await NotificationService.fan_out(
+            NotificationType.MENTION,
+            "benchmark mentioned you",
+            recipients,
+            event_id=run_id
+        )
+        elapsed = time.perf_counter() - started
+        print(f"✓ fan_out: {written} notifications in {elapsed:.2f}s ({written / elapsed:.0f}/s)")
+
+        # A re-run of the same event must not write duplicates
+        started = time.perf_counter()
+        rewritten = await NotificationService.fan_out(
+            NotificationType.MENTION,
+            "benchmark mentioned you",
+            recipients,
+            event_id=run_id
+        )
+        elapsed = time.perf_counter() - started
+        print(f"✓ fan_out re-run: {rewritten} new notifications in {elapsed:.2f}s")
+
+        # Baseline: one insert per recipient, on a sample to keep the run short
+        sample = recipients[:min(1000, recipient_count)]
+        started = time.perf_counter()
+        for recipient_id in sample:
+            await NotificationService.create_notification(NotificationCreate(
+                user_id=recipient_id,
+                type=NotificationType.MENTION,
+                content="benchmark mentioned you"
+            ))
+        elapsed = time.perf_counter() - started
+        print(f"✓ create_notification: {len(sample)} notifications in {elapsed:.2f}s ({len(sample) / elapsed:.0f}/s)")
+    finally:
+        await Notification.find({"user_id": {"$regex": f"^{run_id}:"}}).delete()
+        await NotificationCounter.find({"_id": {"$regex": f"^{run_id}:"}}).delete()
+        await close_mongo_connection()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark notification fan-out")
+    parser.add_argument("recipients", nargs="?", type=int, default=10000)
+    parser.add_argument("--mongodb-url", default=os.environ.get("BENCHMARK_MONGODB_URL"))
+    parser.add_argument("--database", default="stackit_benchmark")
+    args = parser.parse_args()
+
+    if not args.mongodb_url:
+        sys.exit("✗ Pass --mongodb-url or set BENCHMARK_MONGODB_URL to a non-production server")
+    if args.mongodb_url in (Settings.model_fields["mongodb_url"].default, settings.mongodb_url):
+        sys.exit("✗ Refusing to benchmark against the app's configured MongoDB")
+
+    settings.mongodb_url = args.mongodb_url
+    settings.database_name = args.database
+    asyncio.run(benchmark(args.recipients))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Shared pytest fixtures for StackIt Backend
+"""
+
+import pytest
+import pytest_asyncio
+
+@pytest_asyncio.fixture
+async def db():
+    """Initialize the models against a fresh in-memory MongoDB"""
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    from app.db import database
+    from app.models.notification import Notification
+
+    client = mongomock_motor.AsyncMongoMockClient()
+    original_client = database.AsyncIOMotorClient
+    database.AsyncIOMotorClient = lambda url: client
+    try:
+        await database.connect_to_mongo()
+    finally:
+        database.AsyncIOMotorClient = original_client
+
+    # mongomock drops partialFilterExpression from IndexModel specs, which would make
+    # the coalescing index unique across read notifications too; recreate it with the filter
+    collection = Notification.get_motor_collection()
+    await collection.drop_index("user_id_1_coalesce_key_1")
+    await collection.create_index(
+        [("user_id", 1), ("coalesce_key", 1)],
+        unique=True,
+        partialFilterExpression={"is_read": False, "coalesce_key": {"$type": "string"}}
+    )
+
+    yield database.db.database
+    database.db.client = None
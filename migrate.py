@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+One-off data migrations for StackIt Backend
+
+Fills fields that newer code maintains on every write but that documents
+created by older versions lack: question hot scores, comment ancestors and
+depth, per-answer comment counts and notification retention deadlines. Each
+step only touches documents still missing the field, so re-running is safe.
+
+Run once after upgrading an existing database: python migrate.py
+"""
+
+import asyncio
+
+from app.db.database import connect_to_mongo, close_mongo_connection
+from app.services.ranking_service import RankingService
+from app.services.comment_service import CommentService
+from app.services.notification_service import NotificationService
+
+MIGRATIONS = [
+    ("Question hot scores", RankingService.backfill_hot_scores),
+    ("Comment paths", CommentService.backfill_comment_paths),
+    ("Answer comment counts", CommentService.backfill_comment_counts),
+    ("Notification expiry", NotificationService.backfill_expiry),
+]
+
+async def migrate():
+    """Run every migration in order"""
+    await connect_to_mongo()
+    try:
+        for name, migration in MIGRATIONS:
+            migrated = await migration()
+            print(f"✓ {name}: {migrated} documents updated")
+    finally:
+        await close_mongo_connection()
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Tests for the Redis cache backend against a local stand-in server
+
+Run with: python -m pytest test_cache_backend.py
+"""
+
+import asyncio
+import sys
+import time
+
+import pytest
+import pytest_asyncio
+
+from app.core.cache import Cache, MemoryCacheBackend, RedisCacheBackend
+
+class RedisReplyError(str):
+    """Error reply sent back to the client"""
+
+class StandInRedis:
+    """Minimal in-process server for the RESP2 commands the cache backend uses"""
+
+    def __init__(self):
+        self.values = {}
+        self.sets = {}
+        self.expiry = {}
+        self.subscribers = {}
+        self.commands = []
+        self.connections = {}
+        self.server = None
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        for writer in self.connections.values():
+            writer.close()
+        await asyncio.gather(*self.connections, return_exceptions=True)
+        await self.server.wait_closed()
+
+    def _alive(self, key: bytes) -> bool:
+        deadline = self.expiry.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self.values.pop(key, None)
+            self.sets.pop(key, None)
+            self.expiry.pop(key, None)
+        return key in self.values or key in self.sets
+
+    @staticmethod
+    def _encode(reply) -> bytes:
+        if reply is None:
+            return b"$-1\r\n"
+        if isinstance(reply, RedisReplyError):
+            return f"-{reply}\r\n".encode()
+        if isinstance(reply, str):
+            return f"+{reply}\r\n".encode()
+        if isinstance(reply, int):
+            return f":{reply}\r\n".encode()
+        if isinstance(reply, bytes):
+            return b"$%d\r\n%s\r\n" % (len(reply), reply)
+        return f"*{len(reply)}\r\n".encode() + b"".join(StandInRedis._encode(item) for item in reply)
+
+    async def _read_command(self, reader: asyncio.StreamReader):
+        line = await reader.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int((await reader.readline())[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self.connections[task] = writer
+        try:
+            while True:
+                args = await self._read_command(reader)
+                if args is None:
+                    break
+                name, args = args[0].decode().upper(), args[1:]
+                self.commands.append(name)
+                if name == "SUBSCRIBE":
+                    for index, channel in enumerate(args, 1):
+                        self.subscribers.setdefault(channel, []).append(writer)
+                        writer.write(self._encode([b"subscribe", channel, index]))
+                else:
+                    writer.write(self._encode(self._execute(name, args)))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for writers in self.subscribers.values():
+                if writer in writers:
+                    writers.remove(writer)
+            self.connections.pop(task, None)
+            writer.close()
+
+    def _execute(self, name: str, args: list):
+        if name in ("AUTH", "SELECT", "PING"):
+            return "OK" if name != "PING" else "PONG"
+        if name == "GET":
+            return self.values.get(args[0]) if self._alive(args[0]) else None
+        if name == "SET":
+            self.values[args[0]] = args[1]
+            self.expiry.pop(args[0], None)
+            if len(args) == 4 and args[2].upper() == b"PX":
+                self.expiry[args[0]] = time.monotonic() + int(args[3]) / 1000
+            return "OK"
+        if name == "DEL":
+            removed = 0
+            for key in args:
+                removed += self._alive(key)
+                self.values.pop(key, None)
+                self.sets.pop(key, None)
+                self.expiry.pop(key, None)
+            return removed
+        if name == "SADD":
+            self._alive(args[0])
+            members = self.sets.setdefault(args[0], set())
+            added = len(set(args[1:]) - members)
+            members.update(args[1:])
+            return added
+        if name == "SMEMBERS":
+            return sorted(self.sets.get(args[0], ())) if self._alive(args[0]) else []
+        if name == "EXPIRE":
+            if not self._alive(args[0]):
+                return 0
+            self.expiry[args[0]] = time.monotonic() + int(args[1])
+            return 1
+        if name == "PUBLISH":
+            writers = self.subscribers.get(args[0], [])
+            for writer in writers:
+                writer.write(self._encode([b"message", args[0], args[1]]))
+            return len(writers)
+        return RedisReplyError(f"ERR unknown command '{name}'")
+
+@pytest_asyncio.fixture
+async def server():
+    stand_in = StandInRedis()
+    await stand_in.start()
+    yield stand_in
+    await stand_in.stop()
+
+def redis_url(server: StandInRedis) -> str:
+    return f"redis://:secret@127.0.0.1:{server.server.sockets[0].getsockname()[1]}/2"
+
+@pytest_asyncio.fixture
+async def backend(server):
+    redis = RedisCacheBackend(redis_url(server), pool_size=2, timeout=2.0, tag_ttl=60)
+    yield redis
+    await redis.close()
+
+@pytest.mark.asyncio
+async def test_set_and_get(server, backend):
+    await backend.set("plain", b"value")
+
+    assert await backend.get("plain") == b"value"
+    assert await backend.get("missing") is None
+    assert server.commands[:2] == ["AUTH", "SELECT"]
+
+@pytest.mark.asyncio
+async def test_ttl_expiry(backend):
+    await backend.set("short", b"value", ttl=0.05)
+    await asyncio.sleep(0.1)
+
+    assert await backend.get("short") is None
+
+@pytest.mark.asyncio
+async def test_tag_invalidation(backend):
+    await backend.set("a", b"1", ttl=10, tags=["question:1"])
+    await backend.set("b", b"2", ttl=10, tags=["question:1", "questions"])
+    await backend.set("c", b"3", ttl=10, tags=["questions"])
+
+    assert await backend.invalidate_tags("question:1") == 2
+    assert await backend.get("a") is None
+    assert await backend.get("b") is None
+    assert await backend.get("c") == b"3"
+    assert await backend.delete("a", "b") == 0
+
+@pytest.mark.asyncio
+async def test_error_reply_keeps_connection_usable(backend):
+    await backend.set("c", b"3")
+
+    with pytest.raises(Exception, match="unknown command"):
+        await backend.execute(("NOPE",))
+    assert await backend.get("c") == b"3"
+
+@pytest.mark.asyncio
+async def test_invalidation_reaches_other_workers(server):
+    # Two workers sharing the server, each with a local layer
+    first = Cache(RedisCacheBackend(redis_url(server)), namespace="test", local=MemoryCacheBackend(), local_ttl=30)
+    second = Cache(RedisCacheBackend(redis_url(server)), namespace="test", local=MemoryCacheBackend(), local_ttl=30)
+    try:
+        await first.start()
+        await second.start()
+        await asyncio.sleep(0.1)
+
+        await first.set("user:1", {"username": "alice"}, tags=["user:1"])
+        assert await second.get("user:1") == {"username": "alice"}
+
+        await first.invalidate("user:1")
+        await asyncio.sleep(0.1)
+        assert await second.get("user:1") is None
+        assert await first.get("user:1") is None
+
+        received = []
+        async def handler(message: str):
+            received.append(message)
+        await second.subscribe("events", handler)
+        await asyncio.sleep(0.1)
+        await first.publish("events", "hello")
+        await asyncio.sleep(0.1)
+        assert received == ["hello"]
+        assert first.errors == second.errors == 0
+    finally:
+        await first.close()
+        await second.close()
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
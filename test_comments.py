@@ -0,0 +1,67 @@
+"""
+Tests for comment threads: subtree deletes, comment counts and cursor pagination
+"""
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+
+from app.models.answer import Answer
+from app.models.comment import Comment
+from app.models.question import Question
+from app.models.user import User
+from app.schemas.comment import CommentCreate
+from app.services.comment_service import CommentService
+
+@pytest_asyncio.fixture
+async def answer(db):
+    user = User(username="alice", email="alice@example.com", password_hash="x")
+    await user.insert()
+    question = Question(user_id=user.id, title="How do cursors work?", description="Details")
+    await question.insert()
+    answer = Answer(question_id=question.id, user_id=user.id, description="Like this")
+    await answer.insert()
+    return answer
+
+async def comment(answer: Answer, text: str, parent: Comment = None) -> Comment:
+    return await CommentService.create_comment(
+        CommentCreate(text=text, answer_id=answer.id, parent_id=parent.id if parent else None), answer.user_id
+    )
+
+@pytest.mark.asyncio
+async def test_delete_removes_subtree_and_updates_count(answer):
+    root = await comment(answer, "root")
+    reply = await comment(answer, "reply", root)
+    await comment(answer, "reply to reply", reply)
+    sibling = await comment(answer, "sibling")
+    assert (await Answer.get(answer.id)).comment_count == 4
+
+    await CommentService.delete_comment(root.id, answer.user_id)
+
+    remaining = await Comment.find({"answer_id": answer.id}).to_list()
+    assert [c.id for c in remaining] == [sibling.id]
+    assert (await Answer.get(answer.id)).comment_count == 1
+
+@pytest.mark.asyncio
+async def test_thread_pages_walk_every_root_once(answer):
+    roots = [await comment(answer, f"root {i}") for i in range(5)]
+    await comment(answer, "reply", roots[0])
+
+    seen, cursor = [], None
+    while True:
+        page = await CommentService.get_thread_page(answer.id, limit=2, cursor=cursor)
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == [root.id for root in roots]
+    first = (await CommentService.get_thread_page(answer.id, limit=2))["items"][0]
+    assert first["reply_count"] == 1
+    assert [r["text"] for r in first["replies"]] == ["reply"]
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_is_rejected(answer):
+    with pytest.raises(HTTPException) as error:
+        await CommentService.get_thread_page(answer.id, cursor="not-a-cursor")
+    assert error.value.status_code == 400
@@ -0,0 +1,84 @@
+"""
+Tests for the background job queue
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.jobs import JobQueue
+
+@pytest.mark.asyncio
+async def test_failed_job_is_retried_until_it_succeeds():
+    queue = JobQueue(workers=1, max_retries=3, retry_delay=0.001)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("temporary failure")
+
+    await queue.start()
+    assert queue.submit("flaky", flaky)
+    await queue.stop()
+
+    assert len(attempts) == 3
+    assert queue.stats()["completed"] == 1
+    assert queue.stats()["retried"] == 2
+    assert queue.stats()["failed"] == 0
+
+@pytest.mark.asyncio
+async def test_job_fails_after_max_retries():
+    queue = JobQueue(workers=1, max_retries=2, retry_delay=0.001)
+    attempts = []
+
+    async def broken():
+        attempts.append(1)
+        raise RuntimeError("permanent failure")
+
+    await queue.start()
+    queue.submit("broken", broken)
+    await queue.stop()
+
+    assert len(attempts) == 3
+    assert queue.stats()["failed"] == 1
+    assert queue.stats()["completed"] == 0
+
+@pytest.mark.asyncio
+async def test_stop_drains_queued_jobs_and_rejects_new_ones():
+    queue = JobQueue(workers=2, drain_timeout=5)
+    done = []
+
+    async def work(i):
+        await asyncio.sleep(0.01)
+        done.append(i)
+
+    for i in range(10):
+        queue.submit("work", work, i)
+    await queue.start()
+    await queue.stop()
+
+    assert sorted(done) == list(range(10))
+    assert not queue.submit("late", work, 10)
+    assert queue.stats()["rejected"] == 1
+    assert queue.stats()["depth"] == 0
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_and_reports_lag():
+    queue = JobQueue(maxsize=2, workers=1)
+
+    async def noop():
+        pass
+
+    assert queue.submit("a", noop)
+    assert queue.submit("b", noop)
+    assert not queue.submit("c", noop)
+    await asyncio.sleep(0.01)
+    stats = queue.stats()
+    assert stats["depth"] == 2
+    assert stats["rejected"] == 1
+    assert stats["oldest_lag_seconds"] > 0
+
+    await queue.start()
+    await queue.stop()
+    assert queue.stats()["oldest_lag_seconds"] == 0
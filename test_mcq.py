@@ -0,0 +1,61 @@
+"""
+Tests for quiz question selection and the per-user seen questions
+"""
+
+import asyncio
+import json
+
+import pytest
+import pytest_asyncio
+
+from app.models.mcq import MCQSeenQuestions
+from app.services import mcq_service
+from app.services.mcq_service import MCQService
+from app.services.question_bank import QuestionBank
+
+def bank_question(topic: str, i: int) -> dict:
+    return {
+        "topic": topic,
+        "question_text": f"{topic} question {i}?",
+        "option_a": "A", "option_b": "B", "option_c": "C", "option_d": "D",
+        "correct_option": "A",
+        "difficulty": "medium"
+    }
+
+@pytest_asyncio.fixture
+async def bank(db, tmp_path, monkeypatch):
+    path = tmp_path / "bank.json"
+    path.write_text(json.dumps(
+        [bank_question("python", i) for i in range(20)] + [bank_question("sql", i) for i in range(5)]
+    ))
+    question_bank = QuestionBank(str(path), reload_interval=0)
+    await question_bank.start()
+    monkeypatch.setattr(mcq_service, "question_bank", question_bank)
+    return question_bank
+
+@pytest.mark.asyncio
+async def test_concurrent_quizzes_never_repeat_questions(bank, monkeypatch):
+    get = MCQSeenQuestions.get
+
+    async def slow_get(*args, **kwargs):
+        # Widen the window between reading and writing the seen bits
+        seen = await get(*args, **kwargs)
+        await asyncio.sleep(0.01)
+        return seen
+
+    monkeypatch.setattr(MCQSeenQuestions, "get", slow_get)
+    quizzes = await asyncio.gather(*(
+        MCQService.generate_questions_for_quiz("alice", "Python", num_questions=5) for _ in range(4)
+    ))
+
+    ids = [question.id for quiz in quizzes for question in quiz]
+    assert len(ids) == 20
+    assert len(set(ids)) == 20
+
+@pytest.mark.asyncio
+async def test_unknown_topics_share_one_seen_document(bank):
+    await MCQService.generate_questions_for_quiz("alice", "rust")
+    await MCQService.generate_questions_for_quiz("alice", "haskell")
+
+    seen = await MCQSeenQuestions.find({"user_id": "alice"}).to_list()
+    assert [document.id for document in seen] == ["alice:_all"]
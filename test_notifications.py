@@ -0,0 +1,59 @@
+"""
+Tests for coalesced notifications
+"""
+
+import pytest
+
+from app.models.notification import Notification
+from app.services.notification_service import NotificationService
+
+async def comment_notifications(user_id: str):
+    return await Notification.find({"user_id": user_id, "type": "comment"}).to_list()
+
+@pytest.mark.asyncio
+async def test_actors_share_one_unread_notification(db):
+    await NotificationService.notify_comment_posted("answer-1", "alice", "owner", "question-1", "alice-id")
+    await NotificationService.notify_comment_posted("answer-1", "bob", "owner", "question-1", "bob-id")
+
+    notifications = await comment_notifications("owner")
+    assert len(notifications) == 1
+    assert notifications[0].actor_count == 2
+    assert notifications[0].recent_actors == ["bob", "alice"]
+    assert NotificationService.summarize(notifications[0]).content == "bob and 1 other commented on your answer"
+
+    counter = await NotificationService.get_counter("owner")
+    assert (counter.unread, counter.total) == (1, 1)
+
+@pytest.mark.asyncio
+async def test_repeated_actor_is_counted_once(db):
+    for _ in range(3):
+        await NotificationService.notify_comment_posted("answer-1", "alice", "owner", "question-1", "alice-id")
+
+    notifications = await comment_notifications("owner")
+    assert len(notifications) == 1
+    assert notifications[0].actor_count == 1
+    assert notifications[0].actor_ids == ["alice-id"]
+    assert await NotificationService.get_unread_count("owner") == 1
+
+@pytest.mark.asyncio
+async def test_event_after_read_starts_a_new_notification(db):
+    await NotificationService.notify_comment_posted("answer-1", "alice", "owner", "question-1", "alice-id")
+    first = (await comment_notifications("owner"))[0]
+    await NotificationService.mark_notification_as_read(first.id, "owner")
+
+    await NotificationService.notify_comment_posted("answer-1", "bob", "owner", "question-1", "bob-id")
+
+    notifications = await comment_notifications("owner")
+    assert len(notifications) == 2
+    assert [n.is_read for n in notifications if n.id == first.id] == [True]
+    assert [n.actor_count for n in notifications if n.id != first.id] == [1]
+    counter = await NotificationService.get_counter("owner")
+    assert (counter.unread, counter.total) == (1, 2)
+
+@pytest.mark.asyncio
+async def test_retried_mention_notifies_once(db):
+    for _ in range(2):
+        await NotificationService.notify_mention("bob-id", "alice", "an answer", "question-1", "mention:answer-1")
+
+    assert await Notification.find({"user_id": "bob-id", "type": "mention"}).count() == 1
+    assert await NotificationService.get_unread_count("bob-id") == 1